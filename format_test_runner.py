@@ -8,32 +8,169 @@ requiring full CLI invocation or database operations.
 
 import sys
 import argparse
+import asyncio
+import io
 import json
-from typing import Dict, Any, Optional
+import os
+import shlex
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
 sys.path.append('src')
 
-from es_client.client import ElasticsearchClient
-from formatting_evaluator import FormattingEvaluator
+from json_utils import dumps_bytes
+
+# The ES client and evaluator pull in elasticsearch/neo4j; they are imported
+# where first used so --help and cache-only runs start instantly
+if TYPE_CHECKING:
+    from es_client.client import ElasticsearchClient
+    from formatting_evaluator import FormattingEvaluator, SampleExtractor
+
+# Section separators used by the report output
+_RULE_30 = "-" * 30
+_RULE_40 = "-" * 40
+_RULE_50 = "-" * 50
+_HEAVY_RULE_50 = "=" * 50
+_HEAVY_RULE_60 = "=" * 60
+
+def get_es_client() -> 'ElasticsearchClient':
+    """Return the process-wide Elasticsearch client, creating it on first use."""
+    # Shared with the rest of the process so every runner (and every
+    # interactive command) reuses one connection pool
+    from es_client.client import get_default_client
+    return get_default_client()
+
+
+def stream_pretty(obj: Any, out, depth: int = 0):
+    """
+    Write obj as 2-space indented JSON to the binary stream out.
+    
+    Containers are walked and written piece by piece and only leaf values
+    are encoded, so peak memory is bounded by the largest field rather than
+    the whole document.
+    """
+    if isinstance(obj, dict) and obj:
+        inner = b"  " * (depth + 1)
+        out.write(b"{\n")
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                out.write(b",\n")
+            out.write(inner)
+            out.write(_encode_leaf(key if isinstance(key, str) else str(key)))
+            out.write(b": ")
+            stream_pretty(value, out, depth + 1)
+        out.write(b"\n" + b"  " * depth + b"}")
+    elif isinstance(obj, (list, tuple)) and obj:
+        inner = b"  " * (depth + 1)
+        out.write(b"[\n")
+        for i, value in enumerate(obj):
+            if i:
+                out.write(b",\n")
+            out.write(inner)
+            stream_pretty(value, out, depth + 1)
+        out.write(b"\n" + b"  " * depth + b"]")
+    else:
+        out.write(_encode_leaf(obj))
+
+
+def _encode_leaf(value: Any) -> bytes:
+    """Encode a scalar (or empty container) as compact JSON bytes."""
+    return dumps_bytes(value)
+
+
+def _evaluate_samples(entity_type: str, samples: Optional[list],
+                      sample_count: int) -> Dict[str, Any]:
+    """Process-pool worker: evaluate pre-fetched samples without an ES client."""
+    if samples is None:
+        return {'error': f'No samples available for {entity_type}'}
+    
+    from formatting_evaluator import FormattingEvaluator
+    return FormattingEvaluator().evaluate_entity_type(
+        entity_type, sample_count=sample_count, detailed=False, samples=samples
+    )
 
 
 class FormatTestRunner:
     """Interactive test runner for formatting evaluation during development."""
     
+    BATCH_MODES = ('sequential', 'thread', 'process')
+    
+    SHOW_TYPES = frozenset({'original', 'formatted', 'both'})
+    
+    DEFAULT_ENTITY_TYPES = ['persons', 'publications', 'projects', 'organizations', 'serials']
+    
+    # Seconds a get_cache_info() snapshot is reused by show_cache_status
+    CACHE_INFO_TTL = 2.0
+    
     def __init__(self):
-        self.es_client = None
-        self.evaluator = None
-        self._initialize()
+        # Connections are opened on first use, so help and cache-only
+        # commands start instantly and work offline
+        self._es_client = None
+        self._evaluator = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._offline_extractor = None
+        self._cache_info = None
+        self._cache_info_at = 0.0
+        # Report lines are collected here and written to stdout in one go
+        self._buf = io.StringIO()
+        # Interactive command name -> handler, looked up once per command
+        self._dispatch = {
+            'test': self._cmd_test,
+            'show': self._cmd_show,
+            'extract': self._cmd_extract,
+            'cache': self._cmd_cache,
+            'batch': self._cmd_batch,
+            'help': self._cmd_help,
+            'quit': self._cmd_quit,
+            'exit': self._cmd_quit,
+        }
+    
+    @property
+    def es_client(self) -> Optional['ElasticsearchClient']:
+        """Elasticsearch client, connected on first access."""
+        self._ensure_initialized()
+        return self._es_client
+    
+    @property
+    def evaluator(self) -> Optional['FormattingEvaluator']:
+        """Formatting evaluator, created on first access."""
+        self._ensure_initialized()
+        return self._evaluator
+    
+    @property
+    def sample_extractor(self) -> 'SampleExtractor':
+        """Sample cache access that only reads local files until ES is needed."""
+        if self._evaluator is not None:
+            return self._evaluator.sample_extractor
+        if self._offline_extractor is None:
+            from formatting_evaluator.sample_extractor import SampleExtractor
+            self._offline_extractor = SampleExtractor(None)
+        return self._offline_extractor
+    
+    def _ensure_initialized(self):
+        """Run _initialize exactly once, even if several threads race for it."""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if not self._initialized:
+                # Only attempt once; a failed connection is reported, not retried per command
+                self._initialize()
+                self._initialized = True
     
     def _initialize(self):
         """Initialize connections and evaluator."""
         try:
             print("🔌 Initializing connections...")
-            self.es_client = ElasticsearchClient()
-            if not self.es_client.test_connection():
+            self._es_client = get_es_client()
+            if not self._es_client.test_connection():
                 print("❌ Elasticsearch connection failed")
                 return False
             
-            self.evaluator = FormattingEvaluator(self.es_client)
+            from formatting_evaluator import FormattingEvaluator
+            self._evaluator = FormattingEvaluator(self._es_client)
             print("✅ Ready for testing")
             return True
             
@@ -41,47 +178,99 @@ class FormatTestRunner:
             print(f"❌ Initialization failed: {e}")
             return False
     
+    def start_prefetch(self, entity_types: list = None):
+        """Parse the sample cache files in a background thread while the user types."""
+        thread = threading.Thread(
+            target=self._prefetch_all, args=(entity_types or self.DEFAULT_ENTITY_TYPES,),
+            daemon=True
+        )
+        thread.start()
+    
+    def _prefetch_all(self, entity_types: list):
+        """
+        Background worker for start_prefetch.
+        
+        Only reads the existing cache files (warming the parsed-file cache);
+        it never connects to ES, writes a cache or prints over the prompt.
+        """
+        extractor = self.sample_extractor
+        for entity_type in entity_types:
+            try:
+                extractor.get_cached_samples(entity_type)
+            except Exception:
+                pass  # reported when the sample is actually used
+    
     def quick_test(self, entity_type: str, sample_index: int = 0, show_docs: str = None) -> bool:
         """Quick test of a single sample."""
         if not self.evaluator:
             print("❌ Evaluator not initialized")
             return False
         
-        print(f"\n🧪 QUICK TEST: {entity_type} (sample {sample_index})")
-        print("-" * 50)
+        self._p(f"\n🧪 QUICK TEST: {entity_type} (sample {sample_index})")
+        self._p(_RULE_50)
         
         try:
-            result = self.evaluator.quick_test_single_sample(entity_type, sample_index)
+            result = self.evaluator.quick_test_single_sample(
+                entity_type, sample_index, include_docs=show_docs is not None
+            )
             
             if 'error' in result:
-                print(f"❌ {result['error']}")
+                self._p(f"❌ {result['error']}")
                 return False
             
             # Print compact results
             summary = result['summary']
-            print(f"✅ Results:")
-            print(f"  Sample: {result['sample_id']}")
-            print(f"  Format time: {summary['format_time_ms']:.2f}ms")
-            print(f"  Fields changed: {summary['fields_changed']}")
-            print(f"  Fields added: {summary['added_fields']}")
-            print(f"  Fields removed: {summary['removed_fields']}")
+            self._p(f"✅ Results:")
+            self._p(f"  Sample: {result['sample_id']}")
+            self._p(f"  Format time: {summary['format_time_ms']:.2f}ms")
+            self._p(f"  Fields changed: {summary['fields_changed']}")
+            self._p(f"  Fields added: {summary['added_fields']}")
+            self._p(f"  Fields removed: {summary['removed_fields']}")
             
             # Show documents if requested
             if show_docs in ['original', 'both']:
-                print(f"\n📄 ORIGINAL ES DOCUMENT:")
-                print("-" * 40)
-                print(json.dumps(result['original_document'], indent=2, ensure_ascii=False))
+                self._p(f"\n📄 ORIGINAL ES DOCUMENT:")
+                self._p(_RULE_40)
+                self._print_json(result['original_document'])
             
             if show_docs in ['formatted', 'both']:
-                print(f"\n⚙️ FORMATTED DOCUMENT:")
-                print("-" * 40)
-                print(json.dumps(result['formatted_document'], indent=2, ensure_ascii=False))
+                self._p(f"\n⚙️ FORMATTED DOCUMENT:")
+                self._p(_RULE_40)
+                self._print_json(result['formatted_document'])
             
             return True
             
         except Exception as e:
-            print(f"❌ Test failed: {e}")
+            self._p(f"❌ Test failed: {e}")
             return False
+        finally:
+            self._flush_output()
+    
+    def _p(self, line: str = ""):
+        """Queue a report line; written out by _flush_output."""
+        self._buf.write(line)
+        self._buf.write("\n")
+    
+    def _flush_output(self):
+        """Write all queued report lines with a single stdout write."""
+        output = self._buf.getvalue()
+        if output:
+            sys.stdout.write(output)
+            sys.stdout.flush()
+        self._buf.seek(0)
+        self._buf.truncate()
+    
+    def _print_json(self, obj: Any):
+        """Pretty-print a document, streaming UTF-8 bytes straight to stdout."""
+        buffer = getattr(sys.stdout, 'buffer', None)
+        if buffer is None:
+            self._p(json.dumps(obj, indent=2, ensure_ascii=False))
+            return
+        
+        self._flush_output()  # keep ordering with the queued report lines
+        stream_pretty(obj, buffer)
+        buffer.write(b"\n")
+        buffer.flush()
     
     def extract_samples(self, entity_type: str, count: int = 5) -> bool:
         """Extract and cache samples for testing."""
@@ -90,12 +279,13 @@ class FormatTestRunner:
             return False
         
         print(f"\n📥 EXTRACTING: {count} samples of {entity_type}")
-        print("-" * 50)
+        print(_RULE_50)
         
         try:
             samples = self.evaluator.sample_extractor.extract_samples(
                 entity_type, count, force_refresh=True
             )
+            self._invalidate_cache_info()
             print(f"✅ Cached {len(samples)} {entity_type} samples")
             return True
             
@@ -103,17 +293,42 @@ class FormatTestRunner:
             print(f"❌ Extraction failed: {e}")
             return False
     
-    def show_cache_status(self):
-        """Show cache status for all entity types."""
+    def extract_all(self, entity_types: list, count: int = 5,
+                    force_refresh: bool = False) -> Dict[str, list]:
+        """Fetch samples for several entity types in one ES round-trip."""
         if not self.evaluator:
             print("❌ Evaluator not initialized")
-            return
+            return {}
         
+        try:
+            return self.evaluator.sample_extractor.extract_samples_multi(
+                entity_types, count, force_refresh=force_refresh
+            )
+        except Exception as e:
+            print(f"❌ Extraction failed: {e}")
+            return {}
+        finally:
+            self._invalidate_cache_info()
+    
+    def _get_cache_info(self) -> Dict[str, Any]:
+        """Return cache info, re-reading the cache files at most once per CACHE_INFO_TTL."""
+        now = time.monotonic()
+        if self._cache_info is None or now - self._cache_info_at > self.CACHE_INFO_TTL:
+            self._cache_info = self.sample_extractor.get_cache_info()
+            self._cache_info_at = now
+        return self._cache_info
+    
+    def _invalidate_cache_info(self):
+        """Drop the cached snapshot after sample files have been written."""
+        self._cache_info = None
+    
+    def show_cache_status(self):
+        """Show cache status for all entity types (local files only, no ES)."""
         print(f"\n📁 CACHE STATUS")
-        print("-" * 30)
+        print(_RULE_30)
         
         try:
-            cache_info = self.evaluator.sample_extractor.get_cache_info()
+            cache_info = self._get_cache_info()
             
             for entity_type, info in cache_info.items():
                 if 'status' in info:
@@ -126,48 +341,141 @@ class FormatTestRunner:
         except Exception as e:
             print(f"❌ Cache check failed: {e}")
     
-    def batch_test(self, entity_types: list = None, sample_count: int = 3) -> Dict[str, bool]:
-        """Test all entity types quickly."""
+    async def _evaluate_async(self, entity_type: str, sample_count: int,
+                              semaphore: asyncio.Semaphore,
+                              samples: Optional[list] = None) -> Dict[str, Any]:
+        """Run a (blocking) entity-type evaluation in a worker thread."""
+        async with semaphore:
+            return await asyncio.to_thread(
+                self.evaluator.evaluate_entity_type,
+                entity_type, sample_count=sample_count, detailed=False,
+                samples=samples
+            )
+    
+    async def _evaluate_all_async(self, entity_types: list, sample_count: int,
+                                  n_jobs: int, samples_by_type: Dict[str, list] = None) -> list:
+        """Evaluate entity types concurrently, at most n_jobs at a time."""
+        samples_by_type = samples_by_type or {}
+        semaphore = asyncio.Semaphore(max(1, n_jobs))
+        tasks = [
+            self._evaluate_async(et, sample_count, semaphore, samples_by_type.get(et))
+            for et in entity_types
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _evaluate_all_processes(self, entity_types: list, sample_count: int,
+                                n_jobs: int, samples_by_type: Dict[str, list]) -> list:
+        """Evaluate entity types on separate cores; formatting is CPU-bound Python."""
+        workers = max(1, min(n_jobs, os.cpu_count() or 1, len(entity_types)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_evaluate_samples, et, samples_by_type.get(et), sample_count)
+                for et in entity_types
+            ]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+        return outcomes
+    
+    def _evaluate_all_sequential(self, entity_types: list, sample_count: int,
+                                 samples_by_type: Dict[str, list]) -> list:
+        """Evaluate entity types one after another in this thread."""
+        outcomes = []
+        for entity_type in entity_types:
+            try:
+                outcomes.append(self.evaluator.evaluate_entity_type(
+                    entity_type, sample_count=sample_count, detailed=False,
+                    samples=samples_by_type.get(entity_type)
+                ))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+    
+    def _fetch_batch_samples(self, entity_types: list, sample_count: int) -> Dict[str, list]:
+        """
+        Fetch samples for every entity type in at most two ES round-trips.
+        
+        Cached sample ids are refreshed with one _mget; only types without
+        enough cached samples are extracted with one _msearch, so a full
+        cache is never replaced (and is used as is if ES is unreachable).
+        """
+        extractor = self.evaluator.sample_extractor
+        samples_by_type = extractor.refresh_samples_multi(entity_types, sample_count)
+        
+        missing = [et for et in entity_types if et not in samples_by_type]
+        if missing:
+            samples_by_type.update(self.extract_all(missing, sample_count))
+        
+        return samples_by_type
+    
+    def batch_test(self, entity_types: list = None, sample_count: int = 3,
+                   n_jobs: int = 5, mode: str = 'thread') -> Dict[str, bool]:
+        """
+        Test all entity types quickly.
+        
+        mode picks how evaluations run: 'sequential', 'thread' (concurrent
+        worker threads, the default) or 'process' (one process per core).
+        """
+        if mode not in self.BATCH_MODES:
+            print(f"❌ Unknown batch mode: {mode}")
+            return {}
+        
+        if not self.evaluator:
+            print("❌ Evaluator not initialized")
+            return {}
+        
         if not entity_types:
-            entity_types = ['persons', 'publications', 'projects', 'organizations', 'serials']
+            entity_types = self.DEFAULT_ENTITY_TYPES
         
         print(f"\n🧪 BATCH TEST: {len(entity_types)} entity types")
-        print("=" * 60)
+        print(_HEAVY_RULE_60)
         
         results = {}
         
-        for entity_type in entity_types:
-            try:
-                result = self.evaluator.evaluate_entity_type(
-                    entity_type, sample_count=sample_count, detailed=False
-                )
-                
-                if 'error' in result:
-                    print(f"❌ {entity_type}: {result['error']}")
-                    results[entity_type] = False
-                else:
-                    summary = result['evaluation_summary']
-                    pass_rate = summary['validation_pass_rate']
-                    print(f"{'✅' if pass_rate > 0.8 else '⚠️'} {entity_type}: "
-                          f"{pass_rate:.1%} pass rate, "
-                          f"{summary['avg_format_time_ms']:.1f}ms avg")
-                    results[entity_type] = pass_rate > 0.8
-                    
-            except Exception as e:
-                print(f"❌ {entity_type}: error - {e}")
+        samples_by_type = self._fetch_batch_samples(entity_types, sample_count)
+        
+        # Samples are already in hand, so evaluations are pure formatting work
+        if mode == 'process':
+            outcomes = self._evaluate_all_processes(
+                entity_types, sample_count, n_jobs, samples_by_type
+            )
+        elif mode == 'sequential':
+            outcomes = self._evaluate_all_sequential(entity_types, sample_count, samples_by_type)
+        else:
+            outcomes = asyncio.run(
+                self._evaluate_all_async(entity_types, sample_count, n_jobs, samples_by_type)
+            )
+        
+        for entity_type, result in zip(entity_types, outcomes):
+            if isinstance(result, Exception):
+                self._p(f"❌ {entity_type}: error - {result}")
+                results[entity_type] = False
+            elif 'error' in result:
+                self._p(f"❌ {entity_type}: {result['error']}")
                 results[entity_type] = False
+            else:
+                summary = result['evaluation_summary']
+                pass_rate = summary['validation_pass_rate']
+                self._p(f"{'✅' if pass_rate > 0.8 else '⚠️'} {entity_type}: "
+                        f"{pass_rate:.1%} pass rate, "
+                        f"{summary['avg_format_time_ms']:.1f}ms avg")
+                results[entity_type] = pass_rate > 0.8
         
         # Summary
         passed = sum(results.values())
         total = len(results)
-        print(f"\n📊 SUMMARY: {passed}/{total} entity types passed")
+        self._p(f"\n📊 SUMMARY: {passed}/{total} entity types passed")
+        self._flush_output()
         
         return results
     
     def interactive_mode(self):
         """Interactive mode for development."""
         print("\n🔧 INTERACTIVE MODE")
-        print("=" * 50)
+        print(_HEAVY_RULE_50)
         print("Commands:")
         print("  test <entity_type> [index] - Test single sample")
         print("  show original <entity_type> [index] - Show raw ES document")
@@ -180,48 +488,70 @@ class FormatTestRunner:
         print("  quit - Exit")
         print()
         
+        # Parse the cached samples in the background so the first test is warm
+        self.start_prefetch()
+        
         while True:
             try:
-                cmd = input("format> ").strip().split()
+                # shlex keeps quoted arguments together
+                cmd = shlex.split(input("format> "))
                 
                 if not cmd:
                     continue
                 
-                action = cmd[0].lower()
-                
-                if action == 'quit' or action == 'exit':
-                    break
-                elif action == 'help':
-                    print("Commands: test, show, extract, cache, batch, help, quit")
-                elif action == 'test' and len(cmd) >= 2:
-                    entity_type = cmd[1]
-                    index = int(cmd[2]) if len(cmd) > 2 else 0
-                    self.quick_test(entity_type, index)
-                elif action == 'show' and len(cmd) >= 3:
-                    show_type = cmd[1]  # original, formatted, both
-                    entity_type = cmd[2]
-                    index = int(cmd[3]) if len(cmd) > 3 else 0
-                    if show_type in ['original', 'formatted', 'both']:
-                        self.quick_test(entity_type, index, show_docs=show_type)
-                    else:
-                        print("❌ show command usage: show [original|formatted|both] <entity_type> [index]")
-                elif action == 'extract' and len(cmd) >= 2:
-                    entity_type = cmd[1]
-                    count = int(cmd[2]) if len(cmd) > 2 else 5
-                    self.extract_samples(entity_type, count)
-                elif action == 'cache':
-                    self.show_cache_status()
-                elif action == 'batch':
-                    self.batch_test()
-                else:
+                handler = self._dispatch.get(cmd[0].casefold())
+                if handler is None:
                     print("❌ Unknown command. Type 'help' for commands.")
+                elif handler(cmd[1:]):
+                    break
                     
             except KeyboardInterrupt:
                 print("\nExiting...")
                 break
             except Exception as e:
                 print(f"❌ Error: {e}")
-
+    
+    # Interactive command handlers: each takes the argument list and
+    # returns True to leave interactive mode
+    
+    def _cmd_test(self, args: list) -> bool:
+        if not args:
+            print("❌ test command usage: test <entity_type> [index]")
+            return False
+        index = int(args[1]) if len(args) > 1 else 0
+        self.quick_test(args[0], index)
+        return False
+    
+    def _cmd_show(self, args: list) -> bool:
+        if len(args) < 2 or args[0] not in self.SHOW_TYPES:
+            print("❌ show command usage: show [original|formatted|both] <entity_type> [index]")
+            return False
+        index = int(args[2]) if len(args) > 2 else 0
+        self.quick_test(args[1], index, show_docs=args[0])
+        return False
+    
+    def _cmd_extract(self, args: list) -> bool:
+        if not args:
+            print("❌ extract command usage: extract <entity_type> [count]")
+            return False
+        count = int(args[1]) if len(args) > 1 else 5
+        self.extract_samples(args[0], count)
+        return False
+    
+    def _cmd_cache(self, args: list) -> bool:
+        self.show_cache_status()
+        return False
+    
+    def _cmd_batch(self, args: list) -> bool:
+        self.batch_test()
+        return False
+    
+    def _cmd_help(self, args: list) -> bool:
+        print("Commands: test, show, extract, cache, batch, help, quit")
+        return False
+    
+    def _cmd_quit(self, args: list) -> bool:
+        return True
 
 def main():
     parser = argparse.ArgumentParser(description='Formatting test runner for development')
@@ -235,6 +565,10 @@ def main():
                        help='Number of samples to extract (default: 5)')
     parser.add_argument('--batch', action='store_true',
                        help='Test all entity types')
+    parser.add_argument('--jobs', type=int, default=5,
+                       help='Max concurrent evaluations in batch mode (default: 5)')
+    parser.add_argument('--mode', choices=FormatTestRunner.BATCH_MODES, default='thread',
+                       help='How batch mode runs evaluations (default: thread)')
     parser.add_argument('--interactive', action='store_true',
                        help='Start interactive mode')
     
@@ -242,7 +576,8 @@ def main():
     
     runner = FormatTestRunner()
     
-    if not runner.evaluator:
+    # Only commands that hit Elasticsearch pay for connecting
+    if (args.test or args.extract or args.batch) and not runner.evaluator:
         sys.exit(1)
     
     if args.test:
@@ -252,7 +587,7 @@ def main():
         success = runner.extract_samples(args.extract, args.count)
         sys.exit(0 if success else 1)
     elif args.batch:
-        results = runner.batch_test()
+        results = runner.batch_test(n_jobs=args.jobs, mode=args.mode)
         passed = sum(results.values())
         total = len(results)
         print(f"\nFinal result: {passed}/{total} entity types passed")
@@ -7,92 +7,151 @@ import sys
 import argparse
 import json
 import time
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from itertools import islice
+from typing import Dict, Any, List, Iterator
+
 sys.path.append('src')
 
 from graph_db.connection import Neo4jConnection
 from graph_db.schema import SchemaManager
 from graph_db.db_manager import DatabaseManager
 from graph_db.importer import ImportPipeline
-from es_client.base_extractor import BaseStreamingExtractor
-from es_client.client import ElasticsearchClient
+from graph_db.streaming_importer import StreamingImportPipeline, NodeCentricRelationshipProcessor
+from es_client.base_extractor import BaseStreamingExtractor, PrefetchingExtractor
+from es_client.client import ElasticsearchClient, get_default_client
 from es_client.extractors import (
     PersonExtractor, OrganizationExtractor, PublicationExtractor,
     ProjectExtractor, SerialExtractor
 )
-from es_client.relationship_extractors import RelationshipExtractor
 from formatting_evaluator.formatting_evaluator import FormattingEvaluator
+from formatting_evaluator.sample_extractor import SampleExtractor
+from json_utils import dumps as _dumps, dumps_bytes
+
+
+# Most documents have no identifiers/types, so skip serializing an empty list
+_EMPTY_JSON_LIST = "[]"
+
+
+# Emoji only help an interactive reader; piped or CI output drops them so logs
+# stay plain and non-UTF-8 consoles don't fail to encode them
+_IS_TTY = sys.stdout.isatty()
+
+
+def _e(decoration: str, plain: str = '') -> str:
+    """Return decoration on a terminal, otherwise its plain-text stand-in"""
+    return decoration if _IS_TTY else plain
+
+
+# Relationship types importable by `import relationships`, in processing order,
+# as (type, emoji, source label, target label)
+_ALL_REL_TYPES = (
+    ("AFFILIATED", "👥", "Person", "Organization"),
+    ("AUTHORED", "📄", "Person", "Publication"),
+    ("INVOLVED_IN", "🔬", "Person", "Project"),
+    ("PARTNER", "🏢", "Organization", "Project"),
+    ("PUBLISHED_IN", "📚", "Publication", "Serial"),
+    ("PART_OF", "🏛️", "Organization", "Organization"),
+)
+_VALID_REL_TYPES = frozenset(rel_type for rel_type, _, _, _ in _ALL_REL_TYPES)
 
 class Neo4jCLI:
     """Command line interface for Neo4j operations"""
     
-    def __init__(self):
-        self.neo4j_conn = None
-        self.es_client = None
-        self.schema_manager = None
-        self.db_manager = None
-        self.import_pipeline = None
-        self.formatting_evaluator = None
+    # Connections and managers are built on first access, so commands that
+    # never touch Neo4j or Elasticsearch skip both handshakes entirely
+    @cached_property
+    def neo4j_conn(self) -> Neo4jConnection:
+        return Neo4jConnection()
+    
+    @cached_property
+    def es_client(self) -> ElasticsearchClient:
+        return get_default_client()
+    
+    @cached_property
+    def schema_manager(self) -> SchemaManager:
+        return SchemaManager(self.neo4j_conn)
+    
+    @cached_property
+    def db_manager(self) -> DatabaseManager:
+        return DatabaseManager(self.neo4j_conn)
+    
+    @cached_property
+    def import_pipeline(self) -> ImportPipeline:
+        return ImportPipeline(self.neo4j_conn)
+    
+    @cached_property
+    def formatting_evaluator(self) -> FormattingEvaluator:
+        return FormattingEvaluator(self.es_client)
+    
+    @cached_property
+    def sample_extractor(self) -> SampleExtractor:
+        """Sample cache, usable offline until the evaluator has been built"""
+        if 'formatting_evaluator' in self.__dict__:
+            return self.formatting_evaluator.sample_extractor
+        return SampleExtractor(None)
+    
+    @cached_property
+    def _has_scan(self) -> bool:
+        # Capability never changes for the life of the client, so probe once
+        return callable(getattr(self.es_client, 'scan_documents', None))
     
     def _initialize_connections(self):
         """Initialize database connections"""
         try:
-            self.neo4j_conn = Neo4jConnection()
-            self.es_client = ElasticsearchClient()
-            self.schema_manager = SchemaManager(self.neo4j_conn)
-            self.db_manager = DatabaseManager(self.neo4j_conn)
-            self.import_pipeline = ImportPipeline(self.neo4j_conn)
-            self.formatting_evaluator = FormattingEvaluator(self.es_client)
+            self.neo4j_conn
+            self.es_client
             return True
         except Exception as e:
-            print(f"❌ Failed to initialize connections: {e}")
+            print(f"{_e('❌ ')}Failed to initialize connections: {e}")
             return False
     
     def cmd_test_connections(self, args):
         """Test Neo4j and Elasticsearch connections"""
-        print("🔌 Testing Database Connections")
+        print(f"{_e('🔌 ')}Testing Database Connections")
         print("=" * 40)
         
         # Test Neo4j
-        print("🗄️ Testing Neo4j connection...")
+        print(f"{_e('🗄️ ')}Testing Neo4j connection...")
         if self.neo4j_conn.test_connection():
-            print("  ✅ Neo4j connection successful")
+            print(f"  {_e('✅ ')}Neo4j connection successful")
         else:
-            print("  ❌ Neo4j connection failed")
+            print(f"  {_e('❌ ')}Neo4j connection failed")
             return False
         
         # Test Elasticsearch
-        print("\n🔍 Testing Elasticsearch connection...")
+        print(f"\n{_e('🔍 ')}Testing Elasticsearch connection...")
         if self.es_client.test_connection():
-            print("  ✅ Elasticsearch connection successful")
+            print(f"  {_e('✅ ')}Elasticsearch connection successful")
             # Add scan_documents check
             print("\n  Testing scroll API...")
             try:
-                # Test with a small batch
-                test_extractor = PersonExtractor(self.es_client, batch_size=10)
-                batch_count = 0
-                for batch in test_extractor.extract_batches():
-                    batch_count += 1
-                    if batch_count >= 1:  # Just test one batch
-                        break
-                print("  ✅ Scroll API working correctly")
+                # Open a one-document scroll and close it straight away, which
+                # clears the scroll context instead of leaving it to expire
+                batches = PersonExtractor(self.es_client, batch_size=1).extract_batches()
+                try:
+                    next(batches, None)
+                finally:
+                    batches.close()
+                print(f"  {_e('✅ ')}Scroll API working correctly")
             except Exception as e:
-                print(f"  ⚠️ Scroll API test failed: {e}")
+                print(f"  {_e('⚠️ ')}Scroll API test failed: {e}")
         else:
-            print("  ❌ Elasticsearch connection failed")
+            print(f"  {_e('❌ ')}Elasticsearch connection failed")
             return False
         
-        print("\n✅ All connections successful!")
+        print(f"\n{_e('✅ ')}All connections successful!")
         return True
     
     def cmd_schema_setup(self, args):
         """Set up Neo4j schema (constraints and indexes)"""
-        print("🏗️ Setting up Neo4j Schema")
+        print(f"{_e('🏗️ ')}Setting up Neo4j Schema")
         print("=" * 30)
         
         success = self.schema_manager.setup_schema()
         if success:
-            print("\n📋 Schema Information:")
+            print(f"\n{_e('📋 ')}Schema Information:")
             schema_info = self.schema_manager.get_schema_info()
             print(f"  Constraints: {len(schema_info['constraints'])}")
             print(f"  Indexes: {len(schema_info['indexes'])}")
@@ -102,26 +161,27 @@ class Neo4jCLI:
     
     def cmd_schema_reset(self, args):
         """Reset Neo4j schema (drop and recreate)"""
-        print("🔄 Resetting Neo4j Schema")
+        print(f"{_e('🔄 ')}Resetting Neo4j Schema")
         print("=" * 30)
         
         return self.schema_manager.reset_schema()
     
     def cmd_schema_info(self, args):
         """Show current schema information"""
-        print("📋 Neo4j Schema Information")
+        print(f"{_e('📋 ')}Neo4j Schema Information")
         print("=" * 30)
         
         schema_info = self.schema_manager.get_schema_info()
         
-        print(f"\n🔒 Constraints ({len(schema_info['constraints'])}):")
-        for constraint in schema_info['constraints']:
-            name = constraint.get('name', 'unnamed')
-            label = constraint.get('labelsOrTypes', [''])[0]
-            props = constraint.get('properties', [])
-            print(f"  • {name}: {label}.{','.join(props)}")
+        # Build the whole report first and write it in one go
+        lines = [f"\n{_e('🔒 ')}Constraints ({len(schema_info['constraints'])}):"]
+        lines.extend(
+            f"  • {constraint.get('name', 'unnamed')}: "
+            f"{constraint.get('labelsOrTypes', [''])[0]}.{','.join(constraint.get('properties', []))}"
+            for constraint in schema_info['constraints']
+        )
         
-        print(f"\n🔍 Indexes ({len(schema_info['indexes'])}):")
+        lines.append(f"\n{_e('🔍 ')}Indexes ({len(schema_info['indexes'])}):")
         for index in schema_info['indexes']:
             name = index.get('name', 'unnamed')
             labels = index.get('labelsOrTypes', [])
@@ -131,21 +191,20 @@ class Neo4jCLI:
                 labels = [str(labels)] if labels else ['']
             if not isinstance(props, list):
                 props = [str(props)] if props else ['']
-            print(f"  • {name}: {','.join(labels)}.{','.join(props)}")
+            lines.append(f"  • {name}: {','.join(labels)}.{','.join(props)}")
         
-        print(f"\n🏷️ Node Labels ({len(schema_info['node_labels'])}):")
-        for label in schema_info['node_labels']:
-            print(f"  • {label}")
+        lines.append(f"\n{_e('🏷️ ')}Node Labels ({len(schema_info['node_labels'])}):")
+        lines.extend(f"  • {label}" for label in schema_info['node_labels'])
         
-        print(f"\n🔗 Relationship Types ({len(schema_info['relationship_types'])}):")
-        for rel_type in schema_info['relationship_types']:
-            print(f"  • {rel_type}")
+        lines.append(f"\n{_e('🔗 ')}Relationship Types ({len(schema_info['relationship_types'])}):")
+        lines.extend(f"  • {rel_type}" for rel_type in schema_info['relationship_types'])
         
+        sys.stdout.write("\n".join(lines) + "\n")
         return True
     
     def cmd_db_stats(self, args):
         """Show database statistics"""
-        print("📊 Database Statistics")
+        print(f"{_e('📊 ')}Database Statistics")
         print("=" * 25)
         
         self.db_manager.print_database_stats()
@@ -153,7 +212,7 @@ class Neo4jCLI:
     
     def cmd_clear_db(self, args):
         """Clear database with safety checks"""
-        print("🗑️ Database Clearing")
+        print(f"{_e('🗑️ ')}Database Clearing")
         print("=" * 20)
         
         if args.force:
@@ -168,33 +227,35 @@ class Neo4jCLI:
     
     def cmd_validate_data(self, args):
         """Validate data consistency"""
-        print("🔍 Data Validation")
+        print(f"{_e('🔍 ')}Data Validation")
         print("=" * 20)
         
         result = self.db_manager.validate_data_consistency()
         
         if result['status'] == 'clean':
-            print("✅ Data validation passed - no issues found")
+            print(f"{_e('✅ ')}Data validation passed - no issues found")
         else:
-            print(f"⚠️ Found {len(result['issues'])} issues:")
-            for issue in result['issues']:
-                if 'error' in issue:
-                    print(f"  ❌ {issue['check']}: {issue['error']}")
-                else:
-                    print(f"  ⚠️ {issue['check']}: {issue['count']} items")
+            issues = result['issues']
+            # Classify once up front, failed checks first, then emit in one write
+            errors = [issue for issue in issues if 'error' in issue]
+            warnings = [issue for issue in issues if 'error' not in issue]
+            lines = [f"{_e('⚠️ ')}Found {len(issues)} issues:"]
+            lines.extend(f"  {_e('❌ ')}{issue['check']}: {issue['error']}" for issue in errors)
+            lines.extend(f"  {_e('⚠️ ')}{issue['check']}: {issue['count']} items" for issue in warnings)
+            sys.stdout.write("\n".join(lines) + "\n")
         
         return result['status'] == 'clean'
     
     def cmd_import_sample(self, args):
         """Import sample data using streaming pipeline"""
-        print("🚀 Sample Data Import (Streaming Mode)")
+        print(f"{_e('🚀 ')}Sample Data Import (Streaming Mode)")
         print("=" * 35)
         print(f"  Sample size: {args.size}")
         print(f"  Batch size: {args.batch_size}")
         
         # Check if we have streaming support
-        if not hasattr(self.es_client, 'scan_documents'):
-            print("\n⚠️ ERROR: Streaming not available - scan_documents method missing")
+        if not self._has_scan:
+            print(f"\n{_e('⚠️ ')}ERROR: Streaming not available - scan_documents method missing")
             print("  Please update ElasticsearchClient with scroll API support")
             return False
         
@@ -206,12 +267,10 @@ class Neo4jCLI:
         )
         
         if not extractors:
-            print("❌ Failed to prepare streaming extractors")
+            print(f"{_e('❌ ')}Failed to prepare streaming extractors")
             return False
         
         # Use streaming import pipeline
-        from graph_db.streaming_importer import StreamingImportPipeline
-        
         streaming_pipeline = StreamingImportPipeline(
             self.neo4j_conn, 
             batch_size=args.batch_size
@@ -226,15 +285,15 @@ class Neo4jCLI:
     
     def cmd_import_full(self, args):
         """Import full dataset using streaming pipeline"""
-        print("🚀 Full Data Import (Streaming Mode)")
+        print(f"{_e('🚀 ')}Full Data Import (Streaming Mode)")
         print("=" * 35)
         print(f"  Batch size: {args.batch_size}")
         if args.skip_relationships:
-            print("  ⚠️  Skipping relationship import")
+            print(f"  {_e('⚠️ ')} Skipping relationship import")
         
         # Check if we have streaming support
-        if not hasattr(self.es_client, 'scan_documents'):
-            print("\n⚠️ ERROR: Streaming not available - scan_documents method missing")
+        if not self._has_scan:
+            print(f"\n{_e('⚠️ ')}ERROR: Streaming not available - scan_documents method missing")
             print("  Please update ElasticsearchClient with scroll API support")
             return False
         
@@ -247,16 +306,16 @@ class Neo4jCLI:
         extractors = self._prepare_streaming_extractors(
             sample_mode=False,
             batch_size=args.batch_size,
-            entity_types=entity_types
+            entity_types=entity_types,
+            prefetch=not args.no_prefetch,
+            max_records_in_memory=args.max_records_in_memory
         )
         
         if not extractors:
-            print("❌ Failed to prepare streaming extractors")
+            print(f"{_e('❌ ')}Failed to prepare streaming extractors")
             return False
         
         # Use streaming import pipeline
-        from graph_db.streaming_importer import StreamingImportPipeline
-        
         streaming_pipeline = StreamingImportPipeline(
             self.neo4j_conn, 
             batch_size=args.batch_size
@@ -270,9 +329,11 @@ class Neo4jCLI:
     
     def cmd_format_evaluate(self, args):
         """Evaluate document formatting"""
-        print(f"📊 EVALUATING FORMATTING: {args.entity_type}")
+        print(f"{_e('📊 ')}EVALUATING FORMATTING: {args.entity_type}")
         print("=" * 50)
         
+        # Report lines are collected and written with a single write
+        lines = []
         try:
             if args.entity_type == 'all':
                 result = self.formatting_evaluator.evaluate_all_types(
@@ -282,22 +343,22 @@ class Neo4jCLI:
                 
                 # Print summary
                 summary = result['overall_summary']
-                print(f"\n📈 OVERALL RESULTS:")
-                print(f"  Entity types evaluated: {summary['successful_evaluations']}/{summary['total_entity_types']}")
-                print(f"  Total samples processed: {summary['total_samples_processed']}")
-                print(f"  Average validation pass rate: {summary['avg_validation_pass_rate']:.1%}")
+                lines.append(f"\n{_e('📈 ')}OVERALL RESULTS:")
+                lines.append(f"  Entity types evaluated: {summary['successful_evaluations']}/{summary['total_entity_types']}")
+                lines.append(f"  Total samples processed: {summary['total_samples_processed']}")
+                lines.append(f"  Average validation pass rate: {summary['avg_validation_pass_rate']:.1%}")
                 
                 if args.detailed:
-                    print(f"\n📋 DETAILED RESULTS:")
+                    lines.append(f"\n{_e('📋 ')}DETAILED RESULTS:")
                     for entity_type, entity_result in result['entity_results'].items():
                         if 'error' not in entity_result:
                             eval_summary = entity_result['evaluation_summary']
-                            print(f"\n  {entity_type.title()}:")
-                            print(f"    Samples: {eval_summary['samples_processed']}")
-                            print(f"    Format time: {eval_summary['avg_format_time_ms']:.2f}ms avg")
-                            print(f"    Validation: {eval_summary['validation_pass_rate']:.1%} pass rate")
+                            lines.append(f"\n  {entity_type.title()}:")
+                            lines.append(f"    Samples: {eval_summary['samples_processed']}")
+                            lines.append(f"    Format time: {eval_summary['avg_format_time_ms']:.2f}ms avg")
+                            lines.append(f"    Validation: {eval_summary['validation_pass_rate']:.1%} pass rate")
                         else:
-                            print(f"\n  {entity_type.title()}: ERROR - {entity_result['error']}")
+                            lines.append(f"\n  {entity_type.title()}: ERROR - {entity_result['error']}")
             else:
                 result = self.formatting_evaluator.evaluate_entity_type(
                     entity_type=args.entity_type,
@@ -307,48 +368,54 @@ class Neo4jCLI:
                 )
                 
                 if 'error' in result:
-                    print(f"❌ Error: {result['error']}")
+                    print(f"{_e('❌ ')}Error: {result['error']}")
                     return False
                 
                 # Print summary
                 eval_summary = result['evaluation_summary']
-                print(f"\n📈 RESULTS for {args.entity_type}:")
-                print(f"  Samples processed: {eval_summary['samples_processed']}")
-                print(f"  Formatting errors: {eval_summary['formatting_errors']}")
-                print(f"  Average format time: {eval_summary['avg_format_time_ms']:.2f}ms")
-                print(f"  Validation pass rate: {eval_summary['validation_pass_rate']:.1%}")
-                print(f"  Documents with warnings: {eval_summary['documents_with_warnings']}")
+                lines.append(f"\n{_e('📈 ')}RESULTS for {args.entity_type}:")
+                lines.append(f"  Samples processed: {eval_summary['samples_processed']}")
+                lines.append(f"  Formatting errors: {eval_summary['formatting_errors']}")
+                lines.append(f"  Average format time: {eval_summary['avg_format_time_ms']:.2f}ms")
+                lines.append(f"  Validation pass rate: {eval_summary['validation_pass_rate']:.1%}")
+                lines.append(f"  Documents with warnings: {eval_summary['documents_with_warnings']}")
                 
                 # Show validation details
                 validation = result['validation_report']
-                print(f"\n🔍 VALIDATION DETAILS:")
-                print(f"  Valid documents: {validation['valid_documents']}/{validation['total_documents']}")
+                lines.append(f"\n{_e('🔍 ')}VALIDATION DETAILS:")
+                lines.append(f"  Valid documents: {validation['valid_documents']}/{validation['total_documents']}")
                 if validation['common_issues']:
-                    print(f"  Common issues:")
-                    for issue, count in list(validation['common_issues'].items())[:3]:
-                        print(f"    - {issue} ({count} occurrences)")
+                    lines.append(f"  Common issues:")
+                    # common_issues is already ordered by count, most frequent first
+                    for issue, count in islice(validation['common_issues'].items(), 3):
+                        lines.append(f"    - {issue} ({count} occurrences)")
             
+            sys.stdout.write("\n".join(lines) + "\n")
             return True
             
         except Exception as e:
-            print(f"❌ Error during evaluation: {e}")
+            print(f"{_e('❌ ')}Error during evaluation: {e}")
             return False
     
     def cmd_format_test(self, args):
         """Test formatter with a single sample"""
-        print(f"🧪 TESTING FORMATTER: {args.entity_type}")
+        print(f"{_e('🧪 ')}TESTING FORMATTER: {args.entity_type}")
         print("=" * 50)
         
         try:
-            result = self.formatting_evaluator.quick_test_single_sample(args.entity_type, args.index)
+            include_docs = (args.show_original or args.show_formatted
+                            or args.show_both or args.verbose)
+            result = self.formatting_evaluator.quick_test_single_sample(
+                args.entity_type, args.index, include_docs=include_docs
+            )
             
             if 'error' in result:
-                print(f"❌ Error: {result['error']}")
+                print(f"{_e('❌ ')}Error: {result['error']}")
                 return False
             
             # Print compact results
             summary = result['summary']
-            print(f"\n✅ FORMATTING RESULTS:")
+            print(f"\n{_e('✅ ')}FORMATTING RESULTS:")
             print(f"  Sample ID: {result['sample_id']}")
             print(f"  Format time: {summary['format_time_ms']:.2f}ms")
             print(f"  Fields changed: {summary['fields_changed']}")
@@ -357,30 +424,36 @@ class Neo4jCLI:
             
             # Show documents based on flags
             if args.show_original or args.show_both:
-                print(f"\n📄 ORIGINAL ES DOCUMENT:")
+                print(f"\n{_e('📄 ')}ORIGINAL ES DOCUMENT:")
                 print("=" * 60)
-                print(json.dumps(result['original_document'], indent=2, ensure_ascii=False))
+                self._print_json(result['original_document'])
             
             if args.show_formatted or args.show_both:
-                print(f"\n⚙️ FORMATTED DOCUMENT:")
+                print(f"\n{_e('⚙️ ')}FORMATTED DOCUMENT:")
                 print("=" * 60)
-                print(json.dumps(result['formatted_document'], indent=2, ensure_ascii=False))
+                self._print_json(result['formatted_document'])
             
             if args.show_both:
-                print(f"\n🔍 FIELD-LEVEL CHANGES:")
+                print(f"\n{_e('🔍 ')}FIELD-LEVEL CHANGES:")
                 print("=" * 60)
                 analysis = result['formatting_analysis']
+                lines = []
                 if analysis['added_fields']:
-                    print(f"Added fields: {analysis['added_fields']}")
+                    lines.append(f"Added fields: {analysis['added_fields']}")
                 if analysis['removed_fields']:
-                    print(f"Removed fields: {analysis['removed_fields']}")
-                if analysis['transformed_fields']:
-                    print(f"Transformed fields ({len(analysis['transformed_fields'])}):")
-                    for tf in analysis['transformed_fields'][:10]:  # Show first 10
-                        print(f"  {tf['field']}: {tf['original_type']} → {tf['formatted_type']}")
+                    lines.append(f"Removed fields: {analysis['removed_fields']}")
+                transformed = analysis['transformed_fields']
+                if transformed:
+                    lines.append(f"Transformed fields ({len(transformed)}):")
+                    lines.extend(
+                        f"  {tf['field']}: {tf['original_type']} → {tf['formatted_type']}"
+                        for tf in transformed[:10]  # Show first 10
+                    )
+                if lines:
+                    sys.stdout.write("\n".join(lines) + "\n")
             
             if args.verbose:
-                print(f"\n📋 DETAILED COMPARISON:")
+                print(f"\n{_e('📋 ')}DETAILED COMPARISON:")
                 comparison = result['comparison']
                 comp_summary = comparison['summary']
                 print(f"  Total fields: {comp_summary['total_fields']}")
@@ -397,18 +470,31 @@ class Neo4jCLI:
             return True
             
         except Exception as e:
-            print(f"❌ Error during test: {e}")
+            print(f"{_e('❌ ')}Error during test: {e}")
             return False
     
+    @staticmethod
+    def _print_json(obj: Any):
+        """Pretty-print a document straight to stdout without building a str copy."""
+        sys.stdout.flush()  # keep ordering with preceding print() output
+        buffer = getattr(sys.stdout, 'buffer', None)
+        if buffer is not None:
+            buffer.write(dumps_bytes(obj, indent=True))
+            buffer.write(b"\n")
+            buffer.flush()
+        else:
+            json.dump(obj, sys.stdout, indent=2, ensure_ascii=False)
+            sys.stdout.write("\n")
+    
     def cmd_format_compare(self, args):
         """Compare raw vs formatted documents side by side"""
-        print(f"🔍 DOCUMENT COMPARISON: {args.entity_type}")
+        print(f"{_e('🔍 ')}DOCUMENT COMPARISON: {args.entity_type}")
         print("=" * 60)
         
         # Get cached samples
         samples = self.formatting_evaluator.sample_extractor.get_cached_samples(args.entity_type)
         if not samples:
-            print(f"❌ No cached samples found for {args.entity_type}")
+            print(f"{_e('❌ ')}No cached samples found for {args.entity_type}")
             print("   Run 'format extract-samples' first")
             return False
         
@@ -428,13 +514,13 @@ class Neo4jCLI:
                     result, show_full_documents=True
                 )
             else:
-                print(f"❌ Formatting failed: {result.error_message}")
+                print(f"{_e('❌ ')}Formatting failed: {result.error_message}")
         
         return True
     
     def cmd_format_extract_samples(self, args):
         """Extract and cache samples without evaluation"""
-        print(f"📥 EXTRACTING SAMPLES")
+        print(f"{_e('📥 ')}EXTRACTING SAMPLES")
         print("=" * 40)
         
         try:
@@ -443,29 +529,29 @@ class Neo4jCLI:
             else:
                 entity_types = [args.entity_type]
             
-            for entity_type in entity_types:
-                print(f"\nExtracting {args.samples} samples for {entity_type}...")
-                samples = self.formatting_evaluator.sample_extractor.extract_samples(
-                    entity_type=entity_type,
-                    count=args.samples,
-                    force_refresh=args.force_refresh
-                )
-                print(f"  ✅ Cached {len(samples)} {entity_type} samples")
+            # Every type that needs fetching goes out in one _msearch request
+            samples_by_type = self.formatting_evaluator.sample_extractor.extract_samples_multi(
+                entity_types,
+                count=args.samples,
+                force_refresh=args.force_refresh
+            )
+            for entity_type, samples in samples_by_type.items():
+                print(f"  {_e('✅ ')}Cached {len(samples)} {entity_type} samples")
             
-            print(f"\n✅ EXTRACTION COMPLETE")
+            print(f"\n{_e('✅ ')}EXTRACTION COMPLETE")
             return True
             
         except Exception as e:
-            print(f"❌ Error during extraction: {e}")
+            print(f"{_e('❌ ')}Error during extraction: {e}")
             return False
     
     def cmd_format_list_cache(self, args):
         """List cached samples"""
-        print(f"📁 CACHED SAMPLES")
+        print(f"{_e('📁 ')}CACHED SAMPLES")
         print("=" * 30)
         
         try:
-            cached_info = self.formatting_evaluator.sample_extractor.get_cache_info()
+            cached_info = self.sample_extractor.get_cache_info()
             
             if not cached_info:
                 print("No cached samples found")
@@ -473,43 +559,53 @@ class Neo4jCLI:
             
             for entity_type, info in cached_info.items():
                 if 'error' in info:
-                    print(f"❌ {entity_type}: Error - {info['error']}")
+                    print(f"{_e('❌ ')}{entity_type}: Error - {info['error']}")
                 elif 'status' in info:
-                    print(f"⚪ {entity_type}: {info['status']}")
+                    print(f"{_e('⚪ ')}{entity_type}: {info['status']}")
                 else:
                     size_kb = info['file_size'] / 1024
-                    print(f"✅ {entity_type}: {info['count']} samples ({size_kb:.1f} KB)")
+                    print(f"{_e('✅ ')}{entity_type}: {info['count']} samples ({size_kb:.1f} KB)")
                     print(f"   Extracted: {info['extracted_at']}")
             
             return True
             
         except Exception as e:
-            print(f"❌ Error listing cache: {e}")
+            print(f"{_e('❌ ')}Error listing cache: {e}")
             return False
     
     def cmd_format_clear_cache(self, args):
         """Clear cached samples"""
         try:
             if args.entity_type == 'all':
-                self.formatting_evaluator.sample_extractor.clear_cache()
-                print("🗑️ Cleared all cached samples")
+                self.sample_extractor.clear_cache()
+                print(f"{_e('🗑️ ')}Cleared all cached samples")
             else:
-                self.formatting_evaluator.sample_extractor.clear_cache(args.entity_type)
-                print(f"🗑️ Cleared cache for: {args.entity_type}")
+                self.sample_extractor.clear_cache(args.entity_type)
+                print(f"{_e('🗑️ ')}Cleared cache for: {args.entity_type}")
             
             return True
             
         except Exception as e:
-            print(f"❌ Error clearing cache: {e}")
+            print(f"{_e('❌ ')}Error clearing cache: {e}")
             return False
 
     def _prepare_streaming_extractors(self, sample_mode: bool = False, 
                                     sample_size: int = 1000, 
                                     batch_size: int = 1000,
-                                    entity_types: list = None) -> Dict[str, BaseStreamingExtractor]:
-        """Prepare streaming extractors with entity-specific batch sizes"""
+                                    entity_types: list = None,
+                                    prefetch: bool = False,
+                                    max_records_in_memory: int = None) -> Dict[str, BaseStreamingExtractor]:
+        """
+        Prepare streaming extractors with entity-specific batch sizes
+        
+        With prefetch, each extractor scrolls in its own thread; the importer
+        starts the next entity type's scroll once the current one has been
+        read to the end, while its last batches are still written to Neo4j.
+        max_records_in_memory caps the documents held in the prefetch queues
+        of those two types.
+        """
         try:
-            print("📡 Preparing streaming extractors...")
+            print(f"{_e('📡 ')}Preparing streaming extractors...")
             
             # Entity-specific batch sizes optimized for ES performance
             entity_batch_sizes = {
@@ -545,7 +641,7 @@ class Neo4jCLI:
                     if entity_type in all_extractors:
                         extractors[entity_type] = all_extractors[entity_type]
                     else:
-                        print(f"⚠️ Warning: Unknown entity type '{entity_type}', skipping")
+                        print(f"{_e('⚠️ ')}Warning: Unknown entity type '{entity_type}', skipping")
                 print(f"   Selected types: {', '.join(extractors.keys())}")
             else:
                 extractors = all_extractors
@@ -554,17 +650,32 @@ class Neo4jCLI:
                 # For sample mode, we'll use the sample methods
                 print(f"   Sample mode: {sample_size} items per type")
             
+            if prefetch:
+                print("   Prefetching: scrolling one entity type ahead")
+                if max_records_in_memory:
+                    per_type = max_records_in_memory // max(min(len(extractors), 2), 1)
+                    print(f"   Prefetch buffer: {max_records_in_memory:,} documents ({per_type:,} per type)")
+                    extractors = {
+                        name: PrefetchingExtractor(extractor, queue_size=max(1, per_type // extractor.batch_size))
+                        for name, extractor in extractors.items()
+                    }
+                else:
+                    extractors = {
+                        name: PrefetchingExtractor(extractor)
+                        for name, extractor in extractors.items()
+                    }
+            
             return extractors
             
         except Exception as e:
-            print(f"❌ Error preparing streaming extractors: {e}")
+            print(f"{_e('❌ ')}Error preparing streaming extractors: {e}")
             import traceback
             traceback.print_exc()
             return {}
     
     def cmd_import_relationships(self, args):
         """Import relationships only without importing nodes"""
-        print("🔗 Relationship Import")
+        print(f"{_e('🔗 ')}Relationship Import")
         print("=" * 25)
         print(f"  Batch size: {args.batch_size}")
         
@@ -575,68 +686,77 @@ class Neo4jCLI:
             print(f"  Relationship types: {', '.join(relationship_types)}")
             
             # Validate relationship types
-            valid_types = {'AFFILIATED', 'AUTHORED', 'INVOLVED_IN', 'PARTNER', 'PUBLISHED_IN', 'PART_OF'}
-            invalid_types = set(relationship_types) - valid_types
+            invalid_types = [t for t in relationship_types if t not in _VALID_REL_TYPES]
             if invalid_types:
-                print(f"❌ Invalid relationship types: {', '.join(invalid_types)}")
-                print(f"   Valid types: {', '.join(sorted(valid_types))}")
+                print(f"{_e('❌ ')}Invalid relationship types: {', '.join(invalid_types)}")
+                print(f"   Valid types: {', '.join(sorted(_VALID_REL_TYPES))}")
                 return False
         
         # Initialize components
-        from graph_db.streaming_importer import NodeCentricRelationshipProcessor
-        from es_client.client import ElasticsearchClient
-        
-        es_client = ElasticsearchClient()
         node_relationship_processor = NodeCentricRelationshipProcessor(
-            self.neo4j_conn, es_client, f"rel_import_{time.strftime('%Y%m%d_%H%M%S')}"
+            self.neo4j_conn, self.es_client, f"rel_import_{time.time_ns():x}"
         )
         
-        # Define all relationship types with their labels
-        all_relationship_types = [
-            ("AFFILIATED", "👥", "Person", "Organization"),
-            ("AUTHORED", "📄", "Person", "Publication"), 
-            ("INVOLVED_IN", "🔬", "Person", "Project"),
-            ("PARTNER", "🏢", "Organization", "Project"),
-            ("PUBLISHED_IN", "📚", "Publication", "Serial"),
-            ("PART_OF", "🏛️", "Organization", "Organization")
-        ]
-        
         # Filter relationship types if specified
         if relationship_types:
-            types_to_process = [(rel_type, emoji, source, target) for rel_type, emoji, source, target 
-                              in all_relationship_types if rel_type in relationship_types]
+            requested = frozenset(relationship_types)
+            types_to_process = [entry for entry in _ALL_REL_TYPES if entry[0] in requested]
         else:
-            types_to_process = all_relationship_types
+            types_to_process = list(_ALL_REL_TYPES)
         
-        print(f"\n🔗 Processing {len(types_to_process)} relationship type(s)...")
+        print(f"\n{_e('🔗 ')}Processing {len(types_to_process)} relationship type(s)...")
         
         total_relationships = 0
         
-        for rel_type, emoji, source_label, target_label in types_to_process:
-            print(f"\n  {emoji} Processing {rel_type} relationships ({source_label} → {target_label})...")
+        # Types in a wave share no node label, so their MERGEs never lock the
+        # same nodes and can run side by side without deadlocking
+        for wave in self._disjoint_label_waves(types_to_process):
+            for rel_type, emoji, source_label, target_label in wave:
+                print(f"\n  {_e(emoji + ' ')}Processing {rel_type} relationships ({source_label} → {target_label})...")
             
-            try:
-                rel_count = node_relationship_processor.process_relationship_type(
-                    rel_type, source_label, target_label, sample_mode=False
-                )
-                total_relationships += rel_count
-                print(f"    ✓ {rel_type}: {rel_count:,} relationships created")
-            except Exception as e:
-                print(f"    ❌ Error processing {rel_type}: {e}")
+            with ThreadPoolExecutor(max_workers=len(wave)) as executor:
+                futures = [
+                    executor.submit(
+                        node_relationship_processor.process_relationship_type,
+                        rel_type, source_label, target_label, sample_mode=False
+                    )
+                    for rel_type, _, source_label, target_label in wave
+                ]
+                
+                for (rel_type, _, _, _), future in zip(wave, futures):
+                    try:
+                        rel_count = future.result()
+                        total_relationships += rel_count
+                        print(f"    {_e('✓ ')}{rel_type}: {rel_count:,} relationships created")
+                    except Exception as e:
+                        print(f"    {_e('❌ ')}Error processing {rel_type}: {e}")
         
-        print(f"\n  ✅ Total relationships imported: {total_relationships:,}")
+        print(f"\n  {_e('✅ ')}Total relationships imported: {total_relationships:,}")
         
         # Show final statistics
-        print(f"\n📊 Final Database Statistics:")
-        from graph_db.db_manager import DatabaseManager
-        db_manager = DatabaseManager(self.neo4j_conn)
-        db_manager.print_database_stats()
+        print(f"\n{_e('📊 ')}Final Database Statistics:")
+        self.db_manager.print_database_stats()
         
         return True
     
+    @staticmethod
+    def _disjoint_label_waves(types_to_process: list) -> List[list]:
+        """Group (rel_type, emoji, source, target) entries into waves with no shared label."""
+        waves = []
+        for entry in types_to_process:
+            labels = {entry[2], entry[3]}
+            for wave_labels, wave in waves:
+                if not labels & wave_labels:
+                    wave_labels |= labels
+                    wave.append(entry)
+                    break
+            else:
+                waves.append((labels, [entry]))
+        return [wave for _, wave in waves]
+    
     def cmd_dry_run(self, args):
         """Perform dry run validation"""
-        print("🧪 Dry Run Validation")
+        print(f"{_e('🧪 ')}Dry Run Validation")
         print("=" * 25)
         print(f"  Sample size: {args.size}")
         print(f"  Batch size: {args.batch_size}")
@@ -649,9 +769,14 @@ class Neo4jCLI:
         )
         
         if not data_extractors:
-            print("❌ Failed to prepare data extractors")
+            print(f"{_e('❌ ')}Failed to prepare data extractors")
             return False
         
+        # Never pull more than the sample from each stream
+        data_extractors = {
+            name: islice(docs, args.size) for name, docs in data_extractors.items()
+        }
+        
         # Check if dry_run supports batch_size
         try:
             results = self.import_pipeline.dry_run(
@@ -666,12 +791,12 @@ class Neo4jCLI:
                 sample_size=args.size
             )
         
-        print("\n📋 Validation Results:")
+        print(f"\n{_e('📋 ')}Validation Results:")
         overall_valid = True
         
         for data_type, result in results.items():
-            status = "✅" if result['status'] == 'valid' else "⚠️"
-            print(f"  {status} {data_type}: {result['sample_size']} samples")
+            status = _e("✅ ", "[valid] ") if result['status'] == 'valid' else _e("⚠️ ", "[invalid] ")
+            print(f"  {status}{data_type}: {result['sample_size']} samples")
             
             if result['missing_fields']:
                 print(f"    Missing fields: {len(result['missing_fields'])}")
@@ -684,16 +809,24 @@ class Neo4jCLI:
                 overall_valid = False
         
         if overall_valid:
-            print("\n✅ All data validation passed")
+            print(f"\n{_e('✅ ')}All data validation passed")
         else:
-            print("\n⚠️ Data validation found issues")
+            print(f"\n{_e('⚠️ ')}Data validation found issues")
         
         return overall_valid
     
-    def _prepare_data_extractors(self, sample_mode: bool = False, sample_size: int = 1000, batch_size: int = 1000) -> Dict[str, Any]:
-        """Prepare data extractors from Elasticsearch with batch size support (legacy method)"""
+    def _prepare_data_extractors(self, sample_mode: bool = False, sample_size: int = 1000,
+                                 batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Prepare data extractors from Elasticsearch with batch size support (legacy method)
+        
+        Each entity type maps to a lazy generator of formatted documents, so
+        consumers only keep what they actually read (plus the current scroll
+        batch) in memory. Relationships are not extracted here; the streaming
+        import derives them per node instead.
+        """
         try:
-            print("📡 Preparing data extractors (legacy mode)...")
+            print(f"{_e('📡 ')}Preparing data extractors (legacy mode)...")
             print(f"   Batch size: {batch_size}")
             
             extractors = {
@@ -705,44 +838,38 @@ class Neo4jCLI:
             }
             
             data_extractors = {}
-            formatted_documents = {}  # Store for relationship extraction
-            
             for name, extractor in extractors.items():
-                if sample_mode:
-                    data = extractor.extract_sample(size=sample_size)
-                else:
-                    # For full mode, we'll use streaming later
-                    data = list(extractor.extract_all())
-                
-                # Convert ES documents to proper format
-                formatted_data = []
-                for doc in data:
-                    formatted_doc = self._format_document(name, doc)
-                    if formatted_doc:
-                        formatted_data.append(formatted_doc)
-                
-                data_extractors[name] = formatted_data
-                formatted_documents[name] = formatted_data  # Store for relationships
-                print(f"  ✓ {name}: {len(formatted_data)} items prepared")
-            
-            # Extract relationships from the formatted documents
-            from es_client.relationship_extractors import RelationshipExtractor
-            
-            rel_extractor = RelationshipExtractor(formatted_documents)
-            relationships = rel_extractor.extract_all_relationships()
-            
-            # Add relationships to data_extractors
-            data_extractors['relationships'] = relationships
-            print(f"  ✓ relationships: {len(relationships)} extracted")
+                data_extractors[name] = self._iter_formatted(
+                    name, extractor, sample_mode, sample_size
+                )
+                print(f"  {_e('✓ ')}{name}: streaming")
             
             return data_extractors
             
         except Exception as e:
-            print(f"❌ Error preparing data extractors: {e}")
+            print(f"{_e('❌ ')}Error preparing data extractors: {e}")
             import traceback
             traceback.print_exc()
             return {}
     
+    def _iter_formatted(self, name: str, extractor, sample_mode: bool,
+                        sample_size: int) -> Iterator[Dict[str, Any]]:
+        """Lazily extract and format documents of one entity type, a batch at a time."""
+        if sample_mode:
+            yield from self._format_batch(name, extractor.extract_sample(size=sample_size))
+            return
+        
+        for batch in extractor.extract_batches():
+            yield from self._format_batch(name, batch)
+    
+    def _format_batch(self, name: str, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Format a batch of documents, dropping the ones that fail to format."""
+        # Resolve the type's formatter once per batch rather than per document
+        formatter = self._get_formatter(name)
+        if formatter is None:
+            return []
+        return [formatted for doc in docs if (formatted := formatter(doc))]
+    
     def _extract_unified_keywords(self, doc: Dict[str, Any], entity_type: str) -> List[str]:
         """Extract and merge all keyword-like fields into ALL CAPS list"""
         all_keywords = []
@@ -781,98 +908,155 @@ class Neo4jCLI:
         # Remove duplicates and sort
         return sorted(list(set(all_keywords)))
     
+    @cached_property
+    def _formatters(self) -> Dict[str, Any]:
+        """Per-document formatter for each entity type, built once per instance"""
+        return {
+            'persons': self._format_person_document,
+            'organizations': self._format_organization_document,
+            'publications': self._format_publication_document,
+            'projects': self._format_project_document,
+            'serials': self._format_serial_document,
+        }
+    
     def _format_document(self, doc_type: str, doc: Dict[str, Any]) -> Dict[str, Any]:
         """Format Elasticsearch document for Neo4j import"""
-        if doc_type == 'persons':
-            return {
-                'es_id': doc.get('Id', ''),
-                'first_name': doc.get('FirstName', ''),
-                'last_name': doc.get('LastName', ''),
-                'display_name': doc.get('DisplayName', ''),
-                'birth_year': doc.get('BirthYear', 0),
-                'is_active': doc.get('IsActive', False),
-                'has_identifiers': doc.get('HasIdentifiers', False),
-                'identifiers': json.dumps(doc.get('Identifiers', [])),
-                # Keep organization_home for relationship extraction
-                'organization_home': doc.get('OrganizationHome', [])
-            }
-        
-        elif doc_type == 'organizations':
-            return {
-                'es_id': doc.get('Id', ''),
-                'name_swe': doc.get('NameSwe', ''),
-                'name_eng': doc.get('NameEng', ''),
-                'display_name_swe': doc.get('DisplayNameSwe', ''),
-                'display_name_eng': doc.get('DisplayNameEng', ''),
-                'city': doc.get('City', ''),
-                'country': doc.get('Country', ''),
-                'geo_lat': float(doc.get('GeoLat', 0)) if doc.get('GeoLat') else 0,
-                'geo_long': float(doc.get('GeoLong', 0)) if doc.get('GeoLong') else 0,
-                'level': doc.get('Level', 0),
-                'is_active': doc.get('IsActive', False),
-                'organization_types': json.dumps(doc.get('OrganizationTypes', [])),
-                # Keep organization_parents for relationship extraction
-                'organization_parents': doc.get('OrganizationParents', [])
-            }
-        
-        elif doc_type == 'publications':
-            # Extract unified keywords
-            keywords = self._extract_unified_keywords(doc, 'publications')
-            return {
-                'es_id': doc.get('Id', ''),
-                'title': doc.get('Title', ''),
-                'abstract': doc.get('Abstract', ''),
-                'year': doc.get('Year', 0),
-                'publication_type': doc.get('PublicationType', ''),
-                'source': doc.get('Source', ''),
-                'is_draft': doc.get('IsDraft', False),
-                'is_deleted': doc.get('IsDeleted', False),
-                'keywords': keywords,
-                'keywords_count': len(keywords),
-                # Keep these for relationship extraction (note the capitalization)
-                'persons': doc.get('Persons', []),
-                'organizations': doc.get('Organizations', []),
-                'project': doc.get('Project'),
-                'series': doc.get('Series', [])  # This is a list
-            }
-        
-        elif doc_type == 'projects':
-            # Extract unified keywords
-            keywords = self._extract_unified_keywords(doc, 'projects')
-            return {
-                'es_id': str(doc.get('ID', '')),
-                'title_swe': doc.get('ProjectTitleSwe', ''),
-                'title_eng': doc.get('ProjectTitleEng', ''),
-                'description_swe': doc.get('ProjectDescriptionSwe', ''),
-                'description_eng': doc.get('ProjectDescriptionEng', ''),
-                'start_date': doc.get('StartDate', ''),
-                'end_date': doc.get('EndDate', ''),
-                'publish_status': doc.get('PublishStatus', 0),
-                'keywords': keywords,
-                'keywords_count': len(keywords),
-                # Keep these for relationship extraction (note the capitalization)
-                'persons': doc.get('Persons', []),
-                'organizations': doc.get('Organizations', [])
-            }
-        
-        elif doc_type == 'serials':
-            return {
-                'es_id': doc.get('Id', ''),
-                'title': doc.get('Title', ''),
-                'start_year': doc.get('StartYear', 0),
-                'end_year': doc.get('EndYear', 0),
-                'publisher': doc.get('Publisher', ''),
-                'country': doc.get('Country', ''),
-                'is_open_access': doc.get('IsOpenAccess', False),
-                'is_peer_reviewed': doc.get('IsPeerReviewed', False),
-                'is_deleted': doc.get('IsDeleted', False),
-            }
-        
-        return None
-
+        formatter = self._formatters.get(doc_type)
+        return formatter(doc) if formatter is not None else None
     
-    def run(self):
-        """Main CLI entry point"""
+    def _get_formatter(self, doc_type: str):
+        """Return the per-document formatter for a type, or None if unknown"""
+        return self._formatters.get(doc_type)
+    
+    def _format_person_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a person document for Neo4j import"""
+        get = doc.get
+        # Every indexed document has its id; only a malformed one falls back
+        try:
+            es_id = doc['Id']
+        except KeyError:
+            es_id = ''
+        identifiers = get('Identifiers')
+        return {
+            'es_id': es_id,
+            'first_name': get('FirstName', ''),
+            'last_name': get('LastName', ''),
+            'display_name': get('DisplayName', ''),
+            'birth_year': get('BirthYear', 0),
+            'is_active': get('IsActive', False),
+            'has_identifiers': get('HasIdentifiers', False),
+            'identifiers': _dumps(identifiers) if identifiers else _EMPTY_JSON_LIST,
+            # Keep organization_home for relationship extraction
+            'organization_home': get('OrganizationHome', [])
+        }
+    
+    def _format_organization_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Format an organization document for Neo4j import"""
+        get = doc.get
+        try:
+            es_id = doc['Id']
+        except KeyError:
+            es_id = ''
+        geo_lat = get('GeoLat')
+        geo_long = get('GeoLong')
+        org_types = get('OrganizationTypes')
+        return {
+            'es_id': es_id,
+            'name_swe': get('NameSwe', ''),
+            'name_eng': get('NameEng', ''),
+            'display_name_swe': get('DisplayNameSwe', ''),
+            'display_name_eng': get('DisplayNameEng', ''),
+            'city': get('City', ''),
+            'country': get('Country', ''),
+            'geo_lat': float(geo_lat) if geo_lat else 0,
+            'geo_long': float(geo_long) if geo_long else 0,
+            'level': get('Level', 0),
+            'is_active': get('IsActive', False),
+            'organization_types': _dumps(org_types) if org_types else _EMPTY_JSON_LIST,
+            # Keep organization_parents for relationship extraction
+            'organization_parents': get('OrganizationParents', [])
+        }
+    
+    def _format_publication_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a publication document for Neo4j import"""
+        get = doc.get
+        try:
+            es_id = doc['Id']
+        except KeyError:
+            es_id = ''
+        # Extract unified keywords
+        keywords = self._extract_unified_keywords(doc, 'publications')
+        return {
+            'es_id': es_id,
+            'title': get('Title', ''),
+            'abstract': get('Abstract', ''),
+            'year': get('Year', 0),
+            'publication_type': get('PublicationType', ''),
+            'source': get('Source', ''),
+            'is_draft': get('IsDraft', False),
+            'is_deleted': get('IsDeleted', False),
+            'keywords': keywords,
+            'keywords_count': len(keywords),
+            # Keep these for relationship extraction (note the capitalization)
+            'persons': get('Persons', []),
+            'organizations': get('Organizations', []),
+            'project': get('Project'),
+            'series': get('Series', [])  # This is a list
+        }
+    
+    def _format_project_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a project document for Neo4j import"""
+        get = doc.get
+        try:
+            es_id = str(doc['ID'])
+        except KeyError:
+            es_id = ''
+        # Extract unified keywords
+        keywords = self._extract_unified_keywords(doc, 'projects')
+        return {
+            'es_id': es_id,
+            'title_swe': get('ProjectTitleSwe', ''),
+            'title_eng': get('ProjectTitleEng', ''),
+            'description_swe': get('ProjectDescriptionSwe', ''),
+            'description_eng': get('ProjectDescriptionEng', ''),
+            'start_date': get('StartDate', ''),
+            'end_date': get('EndDate', ''),
+            'publish_status': get('PublishStatus', 0),
+            'keywords': keywords,
+            'keywords_count': len(keywords),
+            # Keep these for relationship extraction (note the capitalization)
+            'persons': get('Persons', []),
+            'organizations': get('Organizations', [])
+        }
+    
+    def _format_serial_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a serial document for Neo4j import"""
+        get = doc.get
+        try:
+            es_id = doc['Id']
+        except KeyError:
+            es_id = ''
+        return {
+            'es_id': es_id,
+            'title': get('Title', ''),
+            'start_year': get('StartYear', 0),
+            'end_year': get('EndYear', 0),
+            'publisher': get('Publisher', ''),
+            'country': get('Country', ''),
+            'is_open_access': get('IsOpenAccess', False),
+            'is_peer_reviewed': get('IsPeerReviewed', False),
+            'is_deleted': get('IsDeleted', False),
+        }
+    
+
+    def _build_parser(self) -> argparse.ArgumentParser:
+        """
+        Build the argument parser; each leaf subparser carries its handler.
+        
+        The parser holds handlers bound to this instance and argparse's own
+        local callables, so it can't be pickled across processes; use
+        self._parser, which builds it once per CLI instance.
+        """
         parser = argparse.ArgumentParser(
             description="Neo4j Graph RAG Database Operations CLI",
             formatter_class=argparse.RawDescriptionHelpFormatter
@@ -881,28 +1065,30 @@ class Neo4jCLI:
         subparsers = parser.add_subparsers(dest='command', help='Available commands')
         
         # Test connections
-        subparsers.add_parser('test', help='Test database connections')
+        subparsers.add_parser('test', help='Test database connections').set_defaults(handler=self.cmd_test_connections)
         
         # Schema management
         schema_parser = subparsers.add_parser('schema', help='Schema management')
         schema_subparsers = schema_parser.add_subparsers(dest='schema_action')
-        schema_subparsers.add_parser('setup', help='Set up schema')
-        schema_subparsers.add_parser('reset', help='Reset schema')
-        schema_subparsers.add_parser('info', help='Show schema info')
+        schema_subparsers.add_parser('setup', help='Set up schema').set_defaults(handler=self.cmd_schema_setup)
+        schema_subparsers.add_parser('reset', help='Reset schema').set_defaults(handler=self.cmd_schema_reset)
+        schema_subparsers.add_parser('info', help='Show schema info').set_defaults(handler=self.cmd_schema_info)
         
         # Database management
         db_parser = subparsers.add_parser('db', help='Database management')
         db_subparsers = db_parser.add_subparsers(dest='db_action')
-        db_subparsers.add_parser('stats', help='Show database statistics')
+        db_subparsers.add_parser('stats', help='Show database statistics').set_defaults(handler=self.cmd_db_stats)
         
         clear_parser = db_subparsers.add_parser('clear', help='Clear entire database')
         clear_parser.add_argument('--force', action='store_true', help='Skip confirmation')
+        clear_parser.set_defaults(handler=self.cmd_clear_db)
         
         clear_type_parser = db_subparsers.add_parser('clear-type', help='Clear specific node types')
         clear_type_parser.add_argument('labels', help='Comma-separated list of labels to clear')
         clear_type_parser.add_argument('--force', action='store_true', help='Skip confirmation')
+        clear_type_parser.set_defaults(handler=self.cmd_clear_by_type)
         
-        db_subparsers.add_parser('validate', help='Validate data consistency')
+        db_subparsers.add_parser('validate', help='Validate data consistency').set_defaults(handler=self.cmd_validate_data)
         
         # Import operations
         import_parser = subparsers.add_parser('import', help='Data import operations')
@@ -912,22 +1098,28 @@ class Neo4jCLI:
         sample_parser = import_subparsers.add_parser('sample', help='Import sample data')
         sample_parser.add_argument('--size', type=int, default=1000, help='Sample size per type')
         sample_parser.add_argument('--batch-size', type=int, default=1000, help='Batch size for processing (default: 1000)')
+        sample_parser.set_defaults(handler=self.cmd_import_sample)
         
         # Full import
         full_parser = import_subparsers.add_parser('full', help='Import full dataset')
         full_parser.add_argument('--batch-size', type=int, default=1000, help='Batch size for processing (default: 1000)')
         full_parser.add_argument('--skip-relationships', action='store_true', help='Skip relationship import')
+        full_parser.add_argument('--no-prefetch', action='store_true', help='Scroll entity types one at a time instead of one type ahead')
+        full_parser.add_argument('--max-records-in-memory', type=int, help='Cap on prefetched documents buffered across the two scrolling entity types')
         full_parser.add_argument('--entity-types', type=str, help='Comma-separated list of entity types to import (persons,organizations,publications,projects,serials)')
+        full_parser.set_defaults(handler=self.cmd_import_full)
         
         # Relationships import
         rels_parser = import_subparsers.add_parser('relationships', help='Import relationships only')
         rels_parser.add_argument('--batch-size', type=int, default=1000, help='Batch size for processing (default: 1000)')
         rels_parser.add_argument('--types', type=str, help='Comma-separated list of relationship types (AFFILIATED,AUTHORED,INVOLVED_IN,PARTNER,PUBLISHED_IN,PART_OF)')
+        rels_parser.set_defaults(handler=self.cmd_import_relationships)
         
         # Dry run
         dry_run_parser = import_subparsers.add_parser('dry-run', help='Validate data without importing')
         dry_run_parser.add_argument('--size', type=int, default=100, help='Sample size for validation')
         dry_run_parser.add_argument('--batch-size', type=int, default=1000, help='Batch size for processing (default: 1000)')
+        dry_run_parser.set_defaults(handler=self.cmd_dry_run)
         
         # Formatting evaluation operations
         format_parser = subparsers.add_parser('format', help='Document formatting evaluation')
@@ -940,6 +1132,7 @@ class Neo4jCLI:
         eval_parser.add_argument('--samples', type=int, default=5, help='Number of samples per type (default: 5)')
         eval_parser.add_argument('--force-refresh', action='store_true', help='Force refresh of samples from ES')
         eval_parser.add_argument('--detailed', action='store_true', help='Show detailed formatting results')
+        eval_parser.set_defaults(handler=self.cmd_format_evaluate)
         
         # Test single sample
         test_parser = format_subparsers.add_parser('test', help='Test formatter with a single sample')
@@ -950,12 +1143,14 @@ class Neo4jCLI:
         test_parser.add_argument('--show-formatted', action='store_true', help='Display complete formatted document')
         test_parser.add_argument('--show-original', action='store_true', help='Display raw ES document')
         test_parser.add_argument('--show-both', action='store_true', help='Display both original and formatted documents side-by-side')
+        test_parser.set_defaults(handler=self.cmd_format_test)
         
         # Compare documents
         compare_parser = format_subparsers.add_parser('compare', help='Compare raw vs formatted documents')
         compare_parser.add_argument('entity_type', choices=['persons', 'organizations', 'publications', 'projects', 'serials'],
                                    help='Entity type to compare')
         compare_parser.add_argument('--count', type=int, default=3, help='Number of samples to compare (default: 3)')
+        compare_parser.set_defaults(handler=self.cmd_format_compare)
         
         # Extract samples
         extract_parser = format_subparsers.add_parser('extract-samples', help='Extract and cache samples from ES')
@@ -963,99 +1158,59 @@ class Neo4jCLI:
                                    help='Entity type to extract')
         extract_parser.add_argument('--samples', type=int, default=10, help='Number of samples to extract (default: 10)')
         extract_parser.add_argument('--force-refresh', action='store_true', help='Force refresh even if cache exists')
+        extract_parser.set_defaults(handler=self.cmd_format_extract_samples)
         
-        # Cache management
-        format_subparsers.add_parser('list-cache', help='List cached samples')
+        # Cache management only reads the local sample cache, so it runs offline
+        format_subparsers.add_parser('list-cache', help='List cached samples').set_defaults(
+            handler=self.cmd_format_list_cache, offline=True)
         
         clear_cache_parser = format_subparsers.add_parser('clear-cache', help='Clear cached samples')
         clear_cache_parser.add_argument('entity_type', choices=['all', 'persons', 'organizations', 'publications', 'projects', 'serials'],
                                        help='Entity type to clear (or all)')
+        clear_cache_parser.set_defaults(handler=self.cmd_format_clear_cache, offline=True)
         
-        args = parser.parse_args()
+        return parser
+    
+    @cached_property
+    def _parser(self) -> argparse.ArgumentParser:
+        """Argument parser, reused by every run() on this instance."""
+        return self._build_parser()
+    
+    def run(self, argv=None):
+        """Main CLI entry point"""
+        parser = self._parser
+        args = parser.parse_args(argv)
         
         if not args.command:
             parser.print_help()
             return 1
         
+        handler = getattr(args, 'handler', None)
+        if handler is None:
+            print(f"{_e('❌ ')}Unknown {args.command} action")
+            return 1
+        
         # Initialize connections
-        if not self._initialize_connections():
+        if not getattr(args, 'offline', False) and not self._initialize_connections():
             return 1
         
         # Route commands
         try:
-            if args.command == 'test':
-                success = self.cmd_test_connections(args)
-            
-            elif args.command == 'schema':
-                if args.schema_action == 'setup':
-                    success = self.cmd_schema_setup(args)
-                elif args.schema_action == 'reset':
-                    success = self.cmd_schema_reset(args)
-                elif args.schema_action == 'info':
-                    success = self.cmd_schema_info(args)
-                else:
-                    print("❌ Unknown schema action")
-                    return 1
-            
-            elif args.command == 'db':
-                if args.db_action == 'stats':
-                    success = self.cmd_db_stats(args)
-                elif args.db_action == 'clear':
-                    success = self.cmd_clear_db(args)
-                elif args.db_action == 'clear-type':
-                    success = self.cmd_clear_by_type(args)
-                elif args.db_action == 'validate':
-                    success = self.cmd_validate_data(args)
-                else:
-                    print("❌ Unknown database action")
-                    return 1
-            
-            elif args.command == 'import':
-                if args.import_action == 'sample':
-                    success = self.cmd_import_sample(args)
-                elif args.import_action == 'full':
-                    success = self.cmd_import_full(args)
-                elif args.import_action == 'relationships':
-                    success = self.cmd_import_relationships(args)
-                elif args.import_action == 'dry-run':
-                    success = self.cmd_dry_run(args)
-                else:
-                    print("❌ Unknown import action")
-                    return 1
-            
-            elif args.command == 'format':
-                if args.format_action == 'evaluate':
-                    success = self.cmd_format_evaluate(args)
-                elif args.format_action == 'test':
-                    success = self.cmd_format_test(args)
-                elif args.format_action == 'compare':
-                    success = self.cmd_format_compare(args)
-                elif args.format_action == 'extract-samples':
-                    success = self.cmd_format_extract_samples(args)
-                elif args.format_action == 'list-cache':
-                    success = self.cmd_format_list_cache(args)
-                elif args.format_action == 'clear-cache':
-                    success = self.cmd_format_clear_cache(args)
-                else:
-                    print("❌ Unknown format action")
-                    return 1
-            
-            else:
-                print(f"❌ Unknown command: {args.command}")
-                return 1
+            success = handler(args)
             
             return 0 if success else 1
             
         except KeyboardInterrupt:
-            print("\n⚠️ Operation cancelled by user")
+            print(f"\n{_e('⚠️ ')}Operation cancelled by user")
             return 1
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            print(f"{_e('❌ ')}Unexpected error: {e}")
             import traceback
             traceback.print_exc()
             return 1
         finally:
-            if self.neo4j_conn:
+            # Only close a connection that was actually opened
+            if 'neo4j_conn' in self.__dict__:
                 self.neo4j_conn.close()
 
 
@@ -7,7 +7,7 @@ import sys
 import os
 sys.path.append('src')
 
-from es_client.client import ElasticsearchClient
+from es_client.client import get_default_client
 from es_client.extractors import (
     PersonExtractor,
     OrganizationExtractor,
@@ -23,7 +23,7 @@ def demonstrate_elasticsearch_connectivity():
     
     try:
         # Initialize client
-        client = ElasticsearchClient()
+        client = get_default_client()
         
         # Test connection
         if not client.test_connection():
@@ -39,12 +39,13 @@ def demonstrate_elasticsearch_connectivity():
             'research-serials-static'
         ]
         
-        for index in indexes:
-            try:
-                count = client.count_documents(index)
-                print(f"  📄 {index}: {count:,} documents")
-            except Exception as e:
-                print(f"  ❌ {index}: Error - {e}")
+        # One _msearch round-trip covers every index
+        try:
+            counts = client.count_documents_multi(indexes)
+            for index in indexes:
+                print(f"  📄 {index}: {counts[index]:,} documents")
+        except Exception as e:
+            print(f"  ❌ Error counting documents - {e}")
         
         return True
         
@@ -58,7 +59,7 @@ def demonstrate_data_extractors():
     print("=" * 50)
     
     try:
-        client = ElasticsearchClient()
+        client = get_default_client()
         
         # Test Person Extractor
         print("\n👥 Person Extractor Sample:")
@@ -116,7 +117,7 @@ def demonstrate_relationship_extraction():
     print("=" * 50)
     
     try:
-        client = ElasticsearchClient()
+        client = get_default_client()
         
         # Extract authorship relationships
         print("\n📚 Authorship Relationships:")
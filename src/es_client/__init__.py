@@ -2,8 +2,8 @@
 Elasticsearch integration module
 """
 
-from .client import ElasticsearchClient
-from .base_extractor import BaseExtractor, BaseStreamingExtractor
+from .client import ElasticsearchClient, get_default_client
+from .base_extractor import BaseExtractor, BaseStreamingExtractor, PrefetchingExtractor
 from .extractors import (
     PersonExtractor,
     OrganizationExtractor,
@@ -14,6 +14,8 @@ from .extractors import (
 
 __all__ = [
     "ElasticsearchClient",
+    "get_default_client",
+    "PrefetchingExtractor",
     "PersonExtractor",
     "OrganizationExtractor", 
     "PublicationExtractor",
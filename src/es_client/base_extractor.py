@@ -1,8 +1,17 @@
 # es_client/base_extractor.py
+import queue
+import threading
 from abc import ABC, abstractmethod
+from functools import cached_property
+from itertools import chain
+from operator import itemgetter
 from typing import Iterator, Generator, Dict, Any, List
 from .client import ElasticsearchClient
 
+# Pulls the document out of a search hit; map() over it runs the loop in C
+_get_source = itemgetter('_source')
+
+
 class BaseStreamingExtractor(ABC):
     def __init__(self, es_client, batch_size: int = 1000):
         self.es_client = es_client
@@ -19,9 +28,14 @@ class BaseStreamingExtractor(ABC):
         """Return the query for extracting data"""
         pass
     
+    @cached_property
+    def query(self) -> Dict[str, Any]:
+        """The extractor's query, built once from get_query() and reused"""
+        return self.get_query()
+    
     def extract_batches(self) -> Generator[List[Dict[str, Any]], None, None]:
         """Yield batches of documents"""
-        query = self.get_query()
+        query = self.query
         
         for batch in self.es_client.scan_documents(
             index=self.index_name,
@@ -30,22 +44,128 @@ class BaseStreamingExtractor(ABC):
         ):
             yield batch
     
+    def extract_all(self) -> Iterator[Dict[str, Any]]:
+        """Yield documents one at a time, straight from the scroll pages"""
+        return self.es_client.scan_documents_iter(
+            index=self.index_name,
+            query=self.query,
+            batch_size=self.batch_size
+        )
+    
     def set_batch_size(self, new_batch_size: int) -> None:
         """Update batch size for this extractor"""
         self.batch_size = new_batch_size
     
     def extract_sample_batch(self, size: int = 100) -> List[Dict[str, Any]]:
         """Extract a single sample batch"""
-        query = self.get_query()
+        query = self.query
         result = self.es_client.search(
             index=self.index_name,
-            body={"query": query, "size": size}
+            body={"query": query, "size": size, "track_total_hits": False}
+        )
+        return list(map(_get_source, result['hits']['hits']))
+    
+class PrefetchingExtractor:
+    """
+    Runs a streaming extractor's scroll in a background thread.
+    
+    Batches are handed over through a bounded queue. The thread starts on
+    start_prefetch() or the first extract_batches() call, never earlier; with
+    prefetch_next(other), other starts scrolling as soon as this stream has
+    been read to the end, overlapping with this type's pending Neo4j writes
+    but never sitting on a full queue for a whole import.
+    Everything else (batch_size, es_client, set_batch_size, ...) is delegated
+    to the wrapped extractor. Only the first extract_batches() call uses the
+    prefetched stream; later calls (e.g. import retries) scroll directly.
+    """
+    
+    _DONE = object()
+    
+    def __init__(self, extractor: BaseStreamingExtractor, queue_size: int = 4):
+        self.extractor = extractor
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._consumed = False
+        self._thread = None
+        self._next = None
+    
+    def __getattr__(self, name):
+        return getattr(self.extractor, name)
+    
+    def start_prefetch(self) -> None:
+        """Start scrolling in the background (no-op if already started)"""
+        if self._thread is not None or self._consumed:
+            return
+        self._thread = threading.Thread(
+            target=self._produce,
+            name=f"prefetch-{self.extractor.index_name}",
+            daemon=True
         )
-        return [hit['_source'] for hit in result['hits']['hits']]
+        self._thread.start()
+    
+    def prefetch_next(self, other: 'PrefetchingExtractor') -> None:
+        """Start other's prefetch once this extractor's batches are exhausted"""
+        self._next = other
+    
+    def _start_next(self) -> None:
+        if self._next is not None:
+            self._next.start_prefetch()
+    
+    def stop_prefetch(self, timeout: float = 30.0) -> None:
+        """Stop the producer and wait for it to clear its own scroll context"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def _put(self, item) -> bool:
+        """Queue an item, giving up if the consumer has stopped reading."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _produce(self):
+        batches = self.extractor.extract_batches()
+        try:
+            for batch in batches:
+                if not self._put(batch):
+                    return
+            self._put(self._DONE)
+        except Exception as e:
+            self._put(e)
+        finally:
+            batches.close()  # releases this scroll context only
+    
+    def extract_batches(self) -> Generator[List[Dict[str, Any]], None, None]:
+        """Yield batches from the prefetch queue (first call) or a fresh scroll"""
+        if self._consumed:
+            yield from self.extractor.extract_batches()
+            self._start_next()
+            return
+        
+        self.start_prefetch()
+        self._consumed = True
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._DONE:
+                    self._start_next()
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self._stop.set()
     
 class BaseExtractor:
     """Base class for Elasticsearch data extractors"""
     
+    # IDs per terms query in extract_by_ids, well below the 65536 terms limit
+    ID_CHUNK_SIZE = 1024
+    
     def __init__(self, es_client: ElasticsearchClient, index_name: str):
         self.es = es_client
         self.index_name = index_name
@@ -53,10 +173,27 @@ class BaseExtractor:
     def extract_sample(self, size: int = 10) -> List[Dict[str, Any]]:
         """Extract sample documents"""
         result = self.es.get_sample_documents(self.index_name, size)
-        return [hit['_source'] for hit in result['hits']['hits']]
+        return list(map(_get_source, result['hits']['hits']))
+    
+    def extract_all(self, batch_size: int = 1000, slices: int = 1) -> Iterator[Dict[str, Any]]:
+        """Extract all documents one at a time (see extract_all_batches)"""
+        return chain.from_iterable(self.extract_all_batches(batch_size, slices))
     
-    def extract_all(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
-        """Extract all documents using scroll API"""
+    def extract_all_batches(self, batch_size: int = 1000, slices: int = 1) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Extract all documents using scroll API, one list per scroll response
+        
+        With slices > 1 the index is read as a sliced scroll, one worker
+        thread per slice (ElasticsearchClient.scan_documents_sliced), so
+        shards are scrolled concurrently. Batches then arrive in no
+        particular order.
+        """
+        if slices > 1:
+            yield from self.es.scan_documents_sliced(
+                self.index_name, {"match_all": {}}, slices=slices, batch_size=batch_size
+            )
+            return
+        
         body = {"query": {"match_all": {}}}
         
         # Initial scroll request
@@ -70,31 +207,38 @@ class BaseExtractor:
         scroll_id = result['_scroll_id']
         hits = result['hits']['hits']
         
-        # Yield first batch
-        for hit in hits:
-            yield hit['_source']
-        
-        # Continue scrolling
+        # Continue scrolling until a page comes back empty
         while hits:
+            yield list(map(_get_source, hits))
+            
             result = self.es.scroll_continue(scroll_id, scroll='5m')
             scroll_id = result['_scroll_id']
             hits = result['hits']['hits']
-            
-            for hit in hits:
-                yield hit['_source']
     
     def count_total(self) -> int:
         """Count total documents in the index"""
         return self.es.count_documents(self.index_name)
     
     def extract_by_ids(self, ids: List[str]) -> List[Dict[str, Any]]:
-        """Extract documents by their IDs"""
-        body = {
-            "query": {
-                "terms": {
-                    "_id": ids
-                }
-            }
-        }
-        result = self.es.search(self.index_name, body)
-        return [hit['_source'] for hit in result['hits']['hits']]
\ No newline at end of file
+        """
+        Extract documents by their IDs
+        
+        IDs are split into chunks of ID_CHUNK_SIZE, each its own terms query,
+        and all chunks are sent in a single _msearch request.
+        """
+        if not ids:
+            return []
+        
+        body = []
+        for start in range(0, len(ids), self.ID_CHUNK_SIZE):
+            chunk = ids[start:start + self.ID_CHUNK_SIZE]
+            body.append({"index": self.index_name})
+            body.append({"query": {"terms": {"_id": chunk}}, "size": len(chunk), "track_total_hits": False})
+        
+        docs = []
+        for response in self.es.msearch(body)['responses']:
+            # A failed search comes back in-line rather than as an exception
+            if 'error' in response:
+                raise RuntimeError(f"ID lookup on {self.index_name} failed: {response['error']}")
+            docs.extend(map(_get_source, response['hits']['hits']))
+        return docs
@@ -2,21 +2,74 @@
 Elasticsearch client for connecting to research database
 """
 
+import json
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from elasticsearch import Elasticsearch
+from elasticsearch.serializer import JSONSerializer
 from dotenv import load_dotenv
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Generator, Tuple
+
+from json_utils import dumps, loads
 
 # Load environment variables
 load_dotenv()
 
 
+class OrjsonSerializer(JSONSerializer):
+    """Request/response serializer backed by orjson, which parses scroll pages several times faster"""
+    
+    def loads(self, s):
+        return loads(s)
+    
+    def dumps(self, data):
+        # Pre-serialized bodies (e.g. msearch lines) pass through, as in JSONSerializer
+        if isinstance(data, str):
+            return data
+        return dumps(data, default=self.default)
+
+
+# Scroll pages only need the documents, the cursor and the shard tally; the
+# per-hit _index/_type/_id/_score/sort and the timing fields are dropped by ES
+_SCROLL_FILTER_PATH = ['_scroll_id', '_shards.total', '_shards.successful', 'hits.hits._source']
+
+
+def _page_hits(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Hits of a filtered scroll page; filter_path drops 'hits' entirely when empty"""
+    return response.get('hits', {}).get('hits', [])
+
+
+def _check_shards(index: str, response: Dict[str, Any]) -> None:
+    """
+    Raise if some shards failed to answer a scroll page.
+    
+    Elasticsearch still returns the hits of the shards that did answer, so
+    without this check a scroll would silently skip documents.
+    """
+    shards = response.get('_shards')
+    if shards and shards.get('successful', 0) < shards.get('total', 0):
+        raise RuntimeError(
+            f"Scroll on {index} got answers from only {shards['successful']} "
+            f"of {shards['total']} shards"
+        )
+
+
 class ElasticsearchClient:
     """
     Client for connecting to Elasticsearch research database
+    
+    Each instance owns a keep-alive connection pool, so code that only needs
+    "the" cluster should share one via get_default_client() rather than
+    constructing its own and paying fresh TCP/TLS handshakes.
     """
     
-    def __init__(self):
+    # Seconds a document count is reused before asking Elasticsearch again
+    COUNT_CACHE_TTL = 30.0
+    
+    def __init__(self, pool_maxsize: int = 32):
         self.host = os.getenv('ES_HOST')
         self.username = os.getenv('ES_USER')
         self.password = os.getenv('ES_PASS')
@@ -24,11 +77,25 @@ class ElasticsearchClient:
         if not all([self.host, self.username, self.password]):
             raise ValueError("Missing required Elasticsearch environment variables: ES_HOST, ES_USER, ES_PASS")
         
+        # Keep-alive pool shared by every request on this client, so repeated
+        # calls reuse sockets instead of paying a TCP+TLS handshake each time.
+        # pool_maxsize caps how many threads (prefetch, sliced scrolls,
+        # concurrent opens) hold a connection at once. Timed-out requests
+        # (e.g. a slow scroll page) are retried rather than aborting an import
         self.client = Elasticsearch(
             hosts=[self.host],
             http_auth=(self.username, self.password),
-            verify_certs=False
+            verify_certs=False,
+            maxsize=pool_maxsize,
+            http_compress=True,
+            timeout=60,
+            max_retries=3,
+            retry_on_timeout=True,
+            serializer=OrjsonSerializer()
         )
+        
+        # (index, query json) -> (count, monotonic time fetched)
+        self._count_cache: Dict[Tuple[str, str], Tuple[int, float]] = {}
     
     def ping(self) -> bool:
         """Test connection to Elasticsearch"""
@@ -74,6 +141,25 @@ class ElasticsearchClient:
         """Execute a search query"""
         return self.client.search(index=index, body=body)
     
+    def msearch(self, body: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Execute several searches in one round-trip via the _msearch API.
+        
+        body alternates header and query dicts, e.g.
+        [{"index": "a"}, {"query": ...}, {"index": "b"}, {"query": ...}].
+        The response 'responses' list is in the same order as the queries.
+        """
+        return self.client.msearch(body=body)
+    
+    def mget(self, docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Fetch documents by id from one or more indices in a single request.
+        
+        docs is a list of {"_index": ..., "_id": ...} entries; the response
+        'docs' list is in the same order, with found=False for missing ids.
+        """
+        return self.client.mget(body={'docs': docs})
+    
     def scroll(self, index: str, body: Dict[str, Any], scroll: str = '5m', size: int = 1000):
         """Execute a scroll query for large result sets"""
         return self.client.search(index=index, body=body, scroll=scroll, size=size)
@@ -82,50 +168,191 @@ class ElasticsearchClient:
         """Continue scrolling through results"""
         return self.client.scroll(scroll_id=scroll_id, scroll=scroll)
     
-    def scan_documents(self, index: str, query: Dict[str, Any] = None, 
-                   batch_size: int = 1000, scroll_timeout: str = '5m'):
+    def _scroll_pages(self, index: str, query: Optional[Dict[str, Any]],
+                      batch_size: int, scroll_timeout: str,
+                      slice_: Optional[Dict[str, int]] = None) -> Generator[List[Dict[str, Any]], None, None]:
         """
-        Generator that yields batches of documents using scroll API
+        Generator that yields the raw hits of each scroll page
+        
+        Hits are sorted by _doc (index order), the cheapest scroll order since
+        shards skip scoring and sorting and just stream their segments. The
+        next page is requested in a background thread before the current one
+        is yielded, so the round-trip overlaps with the caller's processing.
+        slice_ ({"id": i, "max": n}) restricts the scroll to one partition.
         """
         if query is None:
             query = {"match_all": {}}
         
+        body = {"query": query, "sort": ["_doc"]}
+        if slice_ is not None:
+            body["slice"] = slice_
+        
         # Initial search
         response = self.client.search(
             index=index,
-            body={"query": query},
+            body=body,
             scroll=scroll_timeout,
-            size=batch_size
+            size=batch_size,
+            filter_path=_SCROLL_FILTER_PATH
         )
         
         scroll_id = response['_scroll_id']
+        next_page = None
         
-        try:
-            while True:
-                hits = response['hits']['hits']
-                if not hits:
-                    break
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"scroll-{index}") as prefetcher:
+            try:
+                while True:
+                    _check_shards(index, response)
+                    hits = _page_hits(response)
+                    if not hits:
+                        break
+                    
+                    # Fetch the next batch while the caller works on this one
+                    next_page = prefetcher.submit(
+                        self.client.scroll,
+                        scroll_id=scroll_id,
+                        scroll=scroll_timeout,
+                        filter_path=_SCROLL_FILTER_PATH
+                    )
+                    yield hits
                     
-                # Yield current batch
+                    response = next_page.result()
+                    next_page = None
+                    scroll_id = response['_scroll_id']
+            except Exception as e:
+                # Log error but don't re-raise immediately - cleanup first
+                print(f"    ⚠️ ES scroll error: {e}")
+                raise
+            finally:
+                # A consumer that stopped early may leave a request in flight;
+                # let it land so the context it returns is the one cleared
+                if next_page is not None:
+                    try:
+                        scroll_id = next_page.result()['_scroll_id']
+                    except Exception:
+                        pass
+                # Always clean up scroll context, even on errors
+                try:
+                    self.client.clear_scroll(scroll_id=scroll_id)
+                except Exception as cleanup_error:
+                    # Don't let cleanup errors mask original errors
+                    print(f"    ⚠️ Failed to cleanup scroll context: {cleanup_error}")
+                    pass
+    
+    def scan_documents(self, index: str, query: Dict[str, Any] = None, 
+                   batch_size: int = 1000, scroll_timeout: str = '5m'):
+        """
+        Generator that yields batches of documents using scroll API
+        
+        See _scroll_pages for ordering, prefetching and cleanup.
+        """
+        pages = self._scroll_pages(index, query, batch_size, scroll_timeout)
+        try:
+            for hits in pages:
                 yield [hit['_source'] for hit in hits]
-                
-                # Get next batch
-                response = self.client.scroll(
-                    scroll_id=scroll_id,
-                    scroll=scroll_timeout
-                )
-        except Exception as e:
-            # Log error but don't re-raise immediately - cleanup first
-            print(f"    ⚠️ ES scroll error: {e}")
-            raise
         finally:
-            # Always clean up scroll context, even on errors
+            pages.close()
+    
+    def scan_documents_iter(self, index: str, query: Dict[str, Any] = None,
+                            batch_size: int = 1000, scroll_timeout: str = '5m') -> Generator[Dict[str, Any], None, None]:
+        """
+        Generator that yields documents one at a time using scroll API
+        
+        Same scroll as scan_documents, for callers that consume documents
+        individually; no per-page list of sources is built.
+        """
+        pages = self._scroll_pages(index, query, batch_size, scroll_timeout)
+        try:
+            for hits in pages:
+                for hit in hits:
+                    yield hit['_source']
+        finally:
+            pages.close()
+    
+    def scan_documents_sliced(self, index: str, query: Dict[str, Any] = None, slices: int = 4,
+                              batch_size: int = 1000, scroll_timeout: str = '5m') -> Generator[List[Dict[str, Any]], None, None]:
+        """
+        Generator that yields batches of documents using a sliced scroll
+        
+        The index is split into slices disjoint partitions, each scrolled by
+        its own worker thread (see _merge_scrolls). Batches arrive in no
+        particular order. slices <= 1 is a plain scan_documents.
+        """
+        if slices <= 1:
+            yield from self.scan_documents(index, query, batch_size, scroll_timeout)
+            return
+        
+        partitions = [(query, {"id": slice_id, "max": slices}) for slice_id in range(slices)]
+        yield from self._merge_scrolls(index, partitions, slices, batch_size, scroll_timeout)
+    
+    def scan_documents_partitioned(self, index: str, queries: List[Dict[str, Any]], max_workers: int = 4,
+                                   batch_size: int = 1000, scroll_timeout: str = '5m') -> Generator[List[Dict[str, Any]], None, None]:
+        """
+        Generator that yields batches from one scroll per query, run concurrently
+        
+        The queries should select disjoint documents (e.g. one per year). Up
+        to max_workers scrolls run at once; batches arrive in no particular order.
+        """
+        partitions = [(query, None) for query in queries]
+        yield from self._merge_scrolls(index, partitions, max_workers, batch_size, scroll_timeout)
+    
+    def _merge_scrolls(self, index: str, partitions: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, int]]]],
+                       max_workers: int, batch_size: int, scroll_timeout: str) -> Generator[List[Dict[str, Any]], None, None]:
+        """
+        Scroll each (query, slice) partition in a worker thread and merge the batches
+        
+        Batches are handed over through a bounded queue, so at most
+        2 * max_workers batches wait in memory.
+        """
+        if not partitions:
+            return
+        
+        max_workers = max(1, min(max_workers, len(partitions)))
+        batches = queue.Queue(maxsize=2 * max_workers)
+        stop = threading.Event()
+        done = object()
+        
+        def put(item) -> bool:
+            # Give up once the consumer has stopped reading
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def scroll_partition(query, slice_):
+            if stop.is_set():
+                put(done)
+                return
+            pages = self._scroll_pages(index, query, batch_size, scroll_timeout, slice_=slice_)
+            try:
+                for hits in pages:
+                    if not put([hit['_source'] for hit in hits]):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                pages.close()
+                put(done)
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"scan-{index}") as executor:
+            for query, slice_ in partitions:
+                executor.submit(scroll_partition, query, slice_)
+            
             try:
-                self.client.clear_scroll(scroll_id=scroll_id)
-            except Exception as cleanup_error:
-                # Don't let cleanup errors mask original errors
-                print(f"    ⚠️ Failed to cleanup scroll context: {cleanup_error}")
-                pass
+                remaining = len(partitions)
+                while remaining:
+                    item = batches.get()
+                    if item is done:
+                        remaining -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stop.set()
     
     def clear_all_scroll_contexts(self) -> bool:
         """Clear all active scroll contexts - useful for cleanup after errors"""
@@ -191,11 +418,48 @@ class ElasticsearchClient:
         return True
 
     def count_documents(self, index: str, query: Optional[Dict[str, Any]] = None) -> int:
-        """Count documents in an index"""
+        """
+        Count documents in an index
+        
+        Counts are reused for COUNT_CACHE_TTL seconds, since progress
+        tracking and batch sizing often ask for the same count back to back.
+        """
         body = {"query": query} if query else {"query": {"match_all": {}}}
+        key = (index, json.dumps(body, sort_keys=True))
+        cached = self._count_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < self.COUNT_CACHE_TTL:
+            return cached[0]
+        
         result = self.client.count(index=index, body=body)
+        self._count_cache[key] = (result['count'], now)
         return result['count']
     
+    def count_documents_multi(self, indices: List[str]) -> Dict[str, int]:
+        """
+        Count documents in several indices with a single _msearch request
+        
+        Each index gets a size-0 search, so only hit totals come back.
+        The totals also seed the count_documents cache. Raises RuntimeError
+        if any of the searches fails.
+        """
+        body = []
+        for index in indices:
+            body.append({"index": index})
+            body.append({"query": {"match_all": {}}, "size": 0, "track_total_hits": True})
+        
+        counts = {}
+        now = time.monotonic()
+        match_all_key = json.dumps({"query": {"match_all": {}}}, sort_keys=True)
+        for index, response in zip(indices, self.msearch(body)['responses']):
+            if 'error' in response:
+                raise RuntimeError(f"Count on {index} failed: {response['error']}")
+            total = response['hits']['total']
+            # 6.x reports a bare number, 7.x an object with a value
+            counts[index] = total['value'] if isinstance(total, dict) else total
+            self._count_cache[(index, match_all_key)] = (counts[index], now)
+        return counts
+    
     def count_batches(self, index: str, batch_size: int = 1000) -> int:
         """Calculate number of batches for progress tracking"""
         total = self.count_documents(index)
@@ -203,9 +467,11 @@ class ElasticsearchClient:
 
     def get_sample_documents(self, index: str, size: int = 10) -> Dict[str, Any]:
         """Get sample documents from an index"""
+        # Only the hits are used, so ES needn't count every match
         body = {
             "query": {"match_all": {}},
-            "size": size
+            "size": size,
+            "track_total_hits": False
         }
         return self.search(index=index, body=body)
     
@@ -218,4 +484,17 @@ class ElasticsearchClient:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
\ No newline at end of file
+        self.close()
+
+
+_default_client: Optional[ElasticsearchClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> ElasticsearchClient:
+    """Return the process-wide Elasticsearch client, creating it on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = ElasticsearchClient()
+        return _default_client
@@ -1,11 +1,55 @@
 """
 Data extractors for each Elasticsearch index with streaming support
 """
+from itertools import chain
 from typing import Iterator, List, Dict, Any, Optional, Generator
 from datetime import datetime
 from .client import ElasticsearchClient
 from .base_extractor import BaseStreamingExtractor, BaseExtractor
 
+# Queries are fixed, so they are built once here rather than on every call.
+# scan_documents only wraps them in a request body and never mutates them.
+# Conditions go in bool/filter context: scrolls never use the score, so ES
+# skips scoring them and can answer from its cached filter bitsets.
+_MATCH_ALL_QUERY = {"match_all": {}}
+
+_ACTIVE_PERSONS_QUERY = {
+    "bool": {
+        "filter": [
+            {"term": {"IsActive": True}},
+            {"term": {"IsDeleted": False}}
+        ]
+    }
+}
+
+_PERSONS_WITH_AFFILIATIONS_QUERY = {
+    "bool": {
+        "filter": [
+            {"term": {"HasOrganizationHome": True}},
+            {"range": {"OrganizationHomeCount": {"gt": 0}}}
+        ]
+    }
+}
+
+_ACTIVE_ORGANIZATIONS_QUERY = {"bool": {"filter": [{"term": {"IsActive": True}}]}}
+
+_PUBLISHED_CLAUSES = (
+    {"term": {"IsDraft": False}},
+    {"term": {"IsDeleted": False}}
+)
+
+_PUBLISHED_PUBLICATIONS_QUERY = {"bool": {"filter": list(_PUBLISHED_CLAUSES)}}
+
+_ACTIVE_PROJECTS_QUERY = {
+    "bool": {
+        "filter": [
+            {"range": {"PublishStatus": {"gte": 1}}}
+        ]
+    }
+}
+
+_ACTIVE_SERIALS_QUERY = {"bool": {"filter": [{"term": {"IsDeleted": False}}]}}
+
 
 class PersonExtractor(BaseStreamingExtractor):
     """Extractor for research-persons-static index with streaming support"""
@@ -21,15 +65,9 @@ class PersonExtractor(BaseStreamingExtractor):
     
     def get_query(self) -> Dict[str, Any]:
         """Return the default query for extracting all persons"""
-        return {"match_all": {}}
-    
-    # Backward compatibility methods that now use streaming
-    def extract_all(self) -> Iterator[Dict[str, Any]]:
-        """Extract all documents (backward compatibility)"""
-        for batch in self.extract_batches():
-            for doc in batch:
-                yield doc
+        return _MATCH_ALL_QUERY
     
+    # Backward compatibility methods
     def extract_sample(self, size: int = 10) -> List[Dict[str, Any]]:
         """Extract sample documents (backward compatibility)"""
         return self.extract_sample_batch(size)
@@ -37,36 +75,18 @@ class PersonExtractor(BaseStreamingExtractor):
     # Specialized extraction methods
     def extract_active_persons_batches(self) -> Generator[List[Dict[str, Any]], None, None]:
         """Extract only active persons in batches"""
-        query = {
-            "bool": {
-                "must": [
-                    {"term": {"IsActive": True}},
-                    {"term": {"IsDeleted": False}}
-                ]
-            }
-        }
-        
         for batch in self.es_client.scan_documents(
             index=self.index_name,
-            query=query,
+            query=_ACTIVE_PERSONS_QUERY,
             batch_size=self.batch_size
         ):
             yield batch
     
     def extract_persons_with_affiliations_batches(self) -> Generator[List[Dict[str, Any]], None, None]:
         """Extract persons who have organizational affiliations in batches"""
-        query = {
-            "bool": {
-                "must": [
-                    {"term": {"HasOrganizationHome": True}},
-                    {"range": {"OrganizationHomeCount": {"gt": 0}}}
-                ]
-            }
-        }
-        
         for batch in self.es_client.scan_documents(
             index=self.index_name,
-            query=query,
+            query=_PERSONS_WITH_AFFILIATIONS_QUERY,
             batch_size=self.batch_size
         ):
             yield batch
@@ -74,15 +94,11 @@ class PersonExtractor(BaseStreamingExtractor):
     # Iterator versions for backward compatibility
     def extract_active_persons(self) -> Iterator[Dict[str, Any]]:
         """Extract only active persons (backward compatibility iterator)"""
-        for batch in self.extract_active_persons_batches():
-            for doc in batch:
-                yield doc
+        return chain.from_iterable(self.extract_active_persons_batches())
     
     def extract_persons_with_affiliations(self) -> Iterator[Dict[str, Any]]:
         """Extract persons with affiliations (backward compatibility iterator)"""
-        for batch in self.extract_persons_with_affiliations_batches():
-            for doc in batch:
-                yield doc
+        return chain.from_iterable(self.extract_persons_with_affiliations_batches())
 
 
 class OrganizationExtractor(BaseStreamingExtractor):
@@ -98,15 +114,9 @@ class OrganizationExtractor(BaseStreamingExtractor):
     
     def get_query(self) -> Dict[str, Any]:
         """Return the default query for extracting all organizations"""
-        return {"match_all": {}}
+        return _MATCH_ALL_QUERY
     
     # Backward compatibility methods
-    def extract_all(self) -> Iterator[Dict[str, Any]]:
-        """Extract all documents (backward compatibility)"""
-        for batch in self.extract_batches():
-            for doc in batch:
-                yield doc
-    
     def extract_sample(self, size: int = 10) -> List[Dict[str, Any]]:
         """Extract sample documents (backward compatibility)"""
         return self.extract_sample_batch(size)
@@ -114,20 +124,16 @@ class OrganizationExtractor(BaseStreamingExtractor):
     # Specialized extraction methods
     def extract_active_organizations_batches(self) -> Generator[List[Dict[str, Any]], None, None]:
         """Extract only active organizations in batches"""
-        query = {"term": {"IsActive": True}}
-        
         for batch in self.es_client.scan_documents(
             index=self.index_name,
-            query=query,
+            query=_ACTIVE_ORGANIZATIONS_QUERY,
             batch_size=self.batch_size
         ):
             yield batch
     
     def extract_active_organizations(self) -> Iterator[Dict[str, Any]]:
         """Extract only active organizations (backward compatibility iterator)"""
-        for batch in self.extract_active_organizations_batches():
-            for doc in batch:
-                yield doc
+        return chain.from_iterable(self.extract_active_organizations_batches())
 
 
 class PublicationExtractor(BaseStreamingExtractor):
@@ -143,53 +149,53 @@ class PublicationExtractor(BaseStreamingExtractor):
     
     def get_query(self) -> Dict[str, Any]:
         """Return the default query for extracting all publications"""
-        return {"match_all": {}}
+        return _MATCH_ALL_QUERY
     
     # Backward compatibility methods
-    def extract_all(self) -> Iterator[Dict[str, Any]]:
-        """Extract all documents (backward compatibility)"""
-        for batch in self.extract_batches():
-            for doc in batch:
-                yield doc
-    
     def extract_sample(self, size: int = 10) -> List[Dict[str, Any]]:
         """Extract sample documents (backward compatibility)"""
         return self.extract_sample_batch(size)
     
     # Specialized extraction methods
-    def extract_published_publications_batches(self) -> Generator[List[Dict[str, Any]], None, None]:
-        """Extract only published (non-draft, non-deleted) publications in batches"""
-        query = {
-            "bool": {
-                "must": [
-                    {"term": {"IsDraft": False}},
-                    {"term": {"IsDeleted": False}}
-                ]
-            }
-        }
+    def extract_published_publications_batches(self, slices: int = 1) -> Generator[List[Dict[str, Any]], None, None]:
+        """
+        Extract only published (non-draft, non-deleted) publications in batches
         
-        for batch in self.es_client.scan_documents(
+        With slices > 1 the index is read as a sliced scroll with that many
+        parallel partitions; batches then arrive in no particular order.
+        """
+        for batch in self.es_client.scan_documents_sliced(
             index=self.index_name,
-            query=query,
+            query=_PUBLISHED_PUBLICATIONS_QUERY,
+            slices=slices,
             batch_size=self.batch_size
         ):
             yield batch
     
-    def extract_by_year_range_batches(self, start_year: int, end_year: int) -> Generator[List[Dict[str, Any]], None, None]:
-        """Extract publications within a year range in batches"""
-        query = {
-            "bool": {
-                "must": [
-                    {"range": {"Year": {"gte": start_year, "lte": end_year}}},
-                    {"term": {"IsDraft": False}},
-                    {"term": {"IsDeleted": False}}
-                ]
+    def extract_by_year_range_batches(self, start_year: int, end_year: int,
+                                      max_workers: int = 4) -> Generator[List[Dict[str, Any]], None, None]:
+        """
+        Extract publications within a year range in batches
+        
+        Each year is its own scroll and up to max_workers years are read at
+        once, so batches arrive in no particular order.
+        """
+        queries = [
+            {
+                "bool": {
+                    "filter": [
+                        {"term": {"Year": year}},
+                        *_PUBLISHED_CLAUSES
+                    ]
+                }
             }
-        }
+            for year in range(start_year, end_year + 1)
+        ]
         
-        for batch in self.es_client.scan_documents(
+        for batch in self.es_client.scan_documents_partitioned(
             index=self.index_name,
-            query=query,
+            queries=queries,
+            max_workers=max_workers,
             batch_size=self.batch_size
         ):
             yield batch
@@ -197,15 +203,11 @@ class PublicationExtractor(BaseStreamingExtractor):
     # Iterator versions for backward compatibility
     def extract_published_publications(self) -> Iterator[Dict[str, Any]]:
         """Extract published publications (backward compatibility iterator)"""
-        for batch in self.extract_published_publications_batches():
-            for doc in batch:
-                yield doc
+        return chain.from_iterable(self.extract_published_publications_batches())
     
     def extract_by_year_range(self, start_year: int, end_year: int) -> Iterator[Dict[str, Any]]:
         """Extract publications by year range (backward compatibility iterator)"""
-        for batch in self.extract_by_year_range_batches(start_year, end_year):
-            for doc in batch:
-                yield doc
+        return chain.from_iterable(self.extract_by_year_range_batches(start_year, end_year))
 
 
 class ProjectExtractor(BaseStreamingExtractor):
@@ -221,15 +223,9 @@ class ProjectExtractor(BaseStreamingExtractor):
     
     def get_query(self) -> Dict[str, Any]:
         """Return the default query for extracting all projects"""
-        return {"match_all": {}}
+        return _MATCH_ALL_QUERY
     
     # Backward compatibility methods
-    def extract_all(self) -> Iterator[Dict[str, Any]]:
-        """Extract all documents (backward compatibility)"""
-        for batch in self.extract_batches():
-            for doc in batch:
-                yield doc
-    
     def extract_sample(self, size: int = 10) -> List[Dict[str, Any]]:
         """Extract sample documents (backward compatibility)"""
         return self.extract_sample_batch(size)
@@ -237,26 +233,16 @@ class ProjectExtractor(BaseStreamingExtractor):
     # Specialized extraction methods
     def extract_active_projects_batches(self) -> Generator[List[Dict[str, Any]], None, None]:
         """Extract projects with publish status indicating they're active in batches"""
-        query = {
-            "bool": {
-                "must": [
-                    {"range": {"PublishStatus": {"gte": 1}}}
-                ]
-            }
-        }
-        
         for batch in self.es_client.scan_documents(
             index=self.index_name,
-            query=query,
+            query=_ACTIVE_PROJECTS_QUERY,
             batch_size=self.batch_size
         ):
             yield batch
     
     def extract_active_projects(self) -> Iterator[Dict[str, Any]]:
         """Extract active projects (backward compatibility iterator)"""
-        for batch in self.extract_active_projects_batches():
-            for doc in batch:
-                yield doc
+        return chain.from_iterable(self.extract_active_projects_batches())
 
 
 class SerialExtractor(BaseStreamingExtractor):
@@ -272,15 +258,9 @@ class SerialExtractor(BaseStreamingExtractor):
     
     def get_query(self) -> Dict[str, Any]:
         """Return the default query for extracting all serials"""
-        return {"match_all": {}}
+        return _MATCH_ALL_QUERY
     
     # Backward compatibility methods
-    def extract_all(self) -> Iterator[Dict[str, Any]]:
-        """Extract all documents (backward compatibility)"""
-        for batch in self.extract_batches():
-            for doc in batch:
-                yield doc
-    
     def extract_sample(self, size: int = 10) -> List[Dict[str, Any]]:
         """Extract sample documents (backward compatibility)"""
         return self.extract_sample_batch(size)
@@ -288,25 +268,21 @@ class SerialExtractor(BaseStreamingExtractor):
     # Specialized extraction methods
     def extract_active_serials_batches(self) -> Generator[List[Dict[str, Any]], None, None]:
         """Extract non-deleted serials in batches"""
-        query = {"term": {"IsDeleted": False}}
-        
         for batch in self.es_client.scan_documents(
             index=self.index_name,
-            query=query,
+            query=_ACTIVE_SERIALS_QUERY,
             batch_size=self.batch_size
         ):
             yield batch
     
     def extract_active_serials(self) -> Iterator[Dict[str, Any]]:
         """Extract active serials (backward compatibility iterator)"""
-        for batch in self.extract_active_serials_batches():
-            for doc in batch:
-                yield doc
+        return chain.from_iterable(self.extract_active_serials_batches())
 
 
 # Helper function to get the count of documents for each extractor
 def get_extraction_counts(es_client: ElasticsearchClient) -> Dict[str, int]:
-    """Get document counts for all indices"""
+    """Get document counts for all indices in a single request"""
     extractors = {
         'persons': PersonExtractor(es_client),
         'organizations': OrganizationExtractor(es_client),
@@ -315,8 +291,5 @@ def get_extraction_counts(es_client: ElasticsearchClient) -> Dict[str, int]:
         'serials': SerialExtractor(es_client)
     }
     
-    counts = {}
-    for name, extractor in extractors.items():
-        counts[name] = es_client.count_documents(extractor.index_name)
-    
-    return counts
\ No newline at end of file
+    counts = es_client.count_documents_multi([e.index_name for e in extractors.values()])
+    return {name: counts[extractor.index_name] for name, extractor in extractors.items()}
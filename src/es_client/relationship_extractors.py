@@ -4,8 +4,239 @@ Extracts relationships from nested Elasticsearch document structures
 """
 
 from typing import Dict, List, Any, Iterator, Tuple
+from dataclasses import dataclass
 from datetime import datetime
-import json
+from itertools import chain, islice
+from sys import intern
+import io
+import linecache
+
+from json_utils import loads as _loads
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; large fields are then parsed whole
+    ijson = None
+
+# JSON-encoded child lists longer than this are parsed incrementally when
+# ijson is available, so only one child dict is alive at a time
+_STREAM_THRESHOLD = 64_000
+
+
+def _stream_items(text: str) -> Iterator[Any]:
+    """Yield the items of a JSON array one at a time, stopping quietly at malformed input."""
+    try:
+        yield from ijson.items(io.BytesIO(text.encode()), 'item', use_float=True)
+    except ijson.JSONError:
+        return
+
+
+def _decode(text: str, single: bool) -> Any:
+    """Decode a JSON-encoded nested field, or return None if it is malformed."""
+    if not single and ijson is not None and len(text) > _STREAM_THRESHOLD:
+        return _stream_items(text)
+    try:
+        return _loads(text)
+    except:
+        return None
+
+
+# Stands in for a property default that is the child's position in its list
+_POSITION = object()
+
+# One row per relationship type:
+#   (rel_type, doc_type, field, id_paths, properties, child_is_source, single)
+# field is the nested (possibly JSON-encoded) list of children on each doc_type
+# document. id_paths are key paths tried in order for the child's id; the
+# first truthy value wins. properties are (name, key_path, default) triples.
+# child_is_source says which end of the edge the child is, and single marks
+# fields holding one child object instead of a list.
+_SPECS = (
+    ('AUTHORED', 'publications', 'persons',
+     (('PersonId',),),
+     (('order', ('Order',), _POSITION),
+      ('role_id', ('Role', 'Id'), ''),
+      ('role_name_swe', ('Role', 'NameSwe'), ''),
+      ('role_name_eng', ('Role', 'NameEng'), '')),
+     True, False),
+    ('INVOLVED_IN', 'projects', 'persons',
+     (('PersonID',),),
+     (('role_id', ('PersonRoleID',), ''),
+      ('role_name_swe', ('PersonRoleName_sv',), ''),
+      ('role_name_eng', ('PersonRoleName_en',), ''),
+      ('organization_id', ('OrganizationID',), '')),
+     True, False),
+    ('AFFILIATED', 'persons', 'organization_home',
+     (('OrganizationId',), ('organization_id',)),
+     (('role', ('Role',), ''),
+      ('start_date', ('StartDate',), ''),
+      ('end_date', ('EndDate',), '')),
+     False, False),
+    ('PARTNER', 'projects', 'organizations',
+     (('OrganizationID',),),
+     (('role_id', ('OrganizationRoleID',), ''),
+      ('role_name_swe', ('OrganizationRoleNameSv',), ''),
+      ('role_name_eng', ('OrganizationRoleNameEn',), '')),
+     True, False),
+    ('OUTPUT', 'publications', 'project',
+     (('ProjectId',), ('project_id',)),
+     (),
+     True, True),
+    ('PUBLISHED_IN', 'publications', 'series',
+     (('SerialItem', 'Id'),),
+     (('serial_number', ('SerialNumber',), ''),),
+     False, False),
+    ('PARENT_OF', 'organizations', 'organization_parents',
+     (('OrganizationId',), ('organization_id',)),
+     (('level', ('Level',), 0),),
+     True, False),
+)
+
+_SPECS_BY_TYPE = {spec[0]: spec for spec in _SPECS}
+
+# Properties drawn from a small vocabulary (roles, dates, home organizations);
+# their string values are interned so repeated values share one object
+_INTERNED_PROPERTIES = frozenset({
+    'role_id', 'role_name_swe', 'role_name_eng', 'role',
+    'organization_id', 'start_date', 'end_date'
+})
+
+# Property names of each relationship type, in the order Rel.props holds them
+SCHEMAS = {spec[0]: tuple(name for name, _, _ in spec[4]) for spec in _SPECS}
+
+
+# Properties of edges that have none (OUTPUT) in to_dict(); shared across
+# all of them, so never mutate it
+_EMPTY_PROPS: Dict[str, Any] = {}
+
+
+@dataclass
+class Rel:
+    """
+    A compact relationship record
+    
+    props holds the property values in schema order, and schema is the shared
+    SCHEMAS tuple of the relationship type, so a record costs one small
+    object and a tuple instead of two dicts. to_dict() gives the
+    {'source_id', 'target_id', 'properties'} form the importers send to Neo4j.
+    """
+    __slots__ = ('source_id', 'target_id', 'props', 'schema')
+    source_id: Any
+    target_id: Any
+    props: Tuple
+    schema: Tuple[str, ...]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'source_id': self.source_id,
+            'target_id': self.target_id,
+            'properties': dict(zip(self.schema, self.props)) if self.props else _EMPTY_PROPS
+        }
+
+
+# Stands in for a missing or malformed sub-dict; shared, so never mutate it
+_EMPTY: Dict[str, Any] = {}
+
+
+def _generate_source(spec: Tuple) -> str:
+    """
+    Write the source of a generator function specialized to one _SPECS row.
+    
+    Key names and defaults become constants in the generated code, each
+    sub-dict a row reads from (e.g. Role) is fetched once per child into a
+    local, and the id fallbacks become one `or` chain, so the loop does no
+    table lookups per child.
+    """
+    rel_type, _, _, id_paths, properties, child_is_source, single = spec
+    lines = [
+        "def extract(docs, share):",
+        "    for doc in docs:",
+        "        doc_id = doc.get('es_id')",
+        "        if not doc_id:",
+        "            continue",
+        f"        children = doc.get({spec[2]!r})",
+        "        if isinstance(children, str):",
+        f"            children = _decode(children, {single})",
+    ]
+    if single:
+        lines.append("        children = (children,)")
+    lines += [
+        "        for idx, child in enumerate(children or ()):",
+        # Children are almost always dicts, so stray values are caught by
+        # the missing .get rather than type-checked every time
+        "            try:",
+        "                get = child.get",
+        "            except AttributeError:",
+        "                continue",
+    ]
+    
+    scopes = {(): 'get'}
+    
+    def getter(path):
+        parent = path[:-1]
+        if parent not in scopes:
+            name = f"s{len(scopes)}"
+            lines.append(f"            {name} = get({parent[0]!r})")
+            for key in parent[1:]:
+                lines.append(f"            if isinstance({name}, dict): {name} = {name}.get({key!r})")
+            lines.append(f"            if not isinstance({name}, dict): {name} = _EMPTY")
+            scopes[parent] = f"{name}.get"
+        return scopes[parent]
+    
+    lookups = [f"{getter(path)}({path[-1]!r})" for path in id_paths]
+    lines += [
+        f"            child_id = {' or '.join(lookups)}",
+        "            if not child_id:",
+        "                continue",
+    ]
+    if single:
+        lines.append("            if child_id.__class__ is not str: child_id = str(child_id)")
+    
+    values = []
+    for i, (name, path, default) in enumerate(properties):
+        default_expr = 'idx' if default is _POSITION else repr(default)
+        lines.append(f"            v{i} = {getter(path)}({path[-1]!r}, {default_expr})")
+        if name in _INTERNED_PROPERTIES:
+            lines.append(f"            if v{i}.__class__ is str: v{i} = intern(v{i})")
+        values.append(f"v{i}")
+    
+    if values:
+        comma = ',' if len(values) == 1 else ''
+        # Keyed on the value types too, so equal but differently typed tuples
+        # such as (1,), (1.0,) and (True,) are never collapsed into one
+        types = ', '.join(f"{v}.__class__" for v in values)
+        lines += [
+            f"            props = ({', '.join(values)}{comma})",
+            "            try:",
+            f"                props = share((({types}{comma}), props), props)",
+            "            except TypeError:  # an unhashable property value; keep it unshared",
+            "                pass",
+        ]
+    else:
+        lines.append("            props = ()")
+    ends = "child_id, doc_id" if child_is_source else "doc_id, child_id"
+    lines.append(f"            yield Rel({ends}, props, schema)")
+    return "\n".join(lines) + "\n"
+
+
+def _generate(spec: Tuple):
+    """Compile the specialized generator function of one _SPECS row."""
+    rel_type = spec[0]
+    filename = f"<relationship extractor {rel_type}>"
+    source = _generate_source(spec)
+    namespace = {
+        'Rel': Rel, '_EMPTY': _EMPTY, '_decode': _decode,
+        'intern': intern, 'schema': SCHEMAS[rel_type]
+    }
+    exec(compile(source, filename, 'exec'), namespace)
+    # Register the source so tracebacks through generated code show its lines
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    extract = namespace['extract']
+    extract.__name__ = extract.__qualname__ = f"extract_{rel_type.lower()}"
+    return extract
+
+
+_EXTRACTORS = {spec[0]: _generate(spec) for spec in _SPECS}
 
 
 class RelationshipExtractor:
@@ -20,246 +251,75 @@ class RelationshipExtractor:
                       e.g., {'persons': [...], 'publications': [...]}
         """
         self.documents = documents
-        self.relationships = {
-            'AUTHORED': [],
-            'INVOLVED_IN': [],
-            'AFFILIATED': [],
-            'PARTNER': [],
-            'OUTPUT': [],
-            'PUBLISHED_IN': [],
-            'PARENT_OF': []
-        }
+        self.relationships = {rel_type: [] for rel_type in SCHEMAS}
+        # Property tuples repeat heavily (same role, same order), so equal
+        # ones are shared through this table rather than stored per edge;
+        # keys are (value types, values) so 1, 1.0 and True stay distinct
+        self._props_table: Dict[Tuple[Tuple[type, ...], Tuple], Tuple] = {}
     
-    def extract_all_relationships(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Extract all relationships from the documents"""
+    def iter_all(self) -> Iterator[Tuple[str, Rel]]:
+        """
+        Lazily yield (rel_type, Rel) pairs for every relationship type
+        
+        Nothing is buffered, so callers can batch straight into Neo4j
+        without holding the full relationship set in memory.
+        """
+        for spec in _SPECS:
+            rel_type = spec[0]
+            for rel in self._iter(spec):
+                yield rel_type, rel
+    
+    def extract_all_relationships(self) -> Dict[str, List[Rel]]:
+        """Extract all relationships from the documents as Rel records, grouped by type"""
         print("🔗 Extracting relationships from documents...")
         
-        # Extract each relationship type
-        self._extract_authored_relationships()
-        self._extract_involved_in_relationships()
-        self._extract_affiliated_relationships()
-        self._extract_partner_relationships()
-        self._extract_output_relationships()
-        self._extract_published_in_relationships()
-        self._extract_parent_of_relationships()
+        self.relationships = {spec[0]: list(self._iter(spec)) for spec in _SPECS}
         
-        # Print summary
-        for rel_type, rels in self.relationships.items():
-            if rels:
-                print(f"  ✓ {rel_type}: {len(rels)} relationships found")
+        # Print summary as one write rather than a flush per type
+        summary = [
+            f"  ✓ {rel_type}: {len(rels)} relationships found"
+            for rel_type, rels in self.relationships.items() if rels
+        ]
+        if summary:
+            print("\n".join(summary))
         
         return self.relationships
     
-    def _extract_authored_relationships(self):
-        """Extract AUTHORED relationships from Publication.persons"""
-        for pub in self.documents.get('publications', []):
-            pub_id = pub.get('es_id')
-            if not pub_id:
-                continue
-            
-            # Get persons from the publication
-            persons = pub.get('persons', [])
-            if isinstance(persons, str):
-                try:
-                    persons = json.loads(persons)
-                except:
-                    persons = []
-            
-            for idx, person_data in enumerate(persons):
-                if isinstance(person_data, dict):
-                    # Person ID is directly in PersonId field
-                    person_id = person_data.get('PersonId')
-                    if person_id:
-                        # Role information is in the Role object
-                        role = person_data.get('Role', {})
-                        rel = {
-                            'source_id': person_id,
-                            'target_id': pub_id,
-                            'properties': {
-                                'order': person_data.get('Order', idx),
-                                'role_id': role.get('Id', ''),
-                                'role_name_swe': role.get('NameSwe', ''),
-                                'role_name_eng': role.get('NameEng', '')
-                            }
-                        }
-                        self.relationships['AUTHORED'].append(rel)
+    def _iter(self, spec: Tuple) -> Iterator[Rel]:
+        """Yield the relationships of one type through its generated extractor"""
+        # Sample runs often lack whole document types; skip the generator then
+        docs = self.documents.get(spec[1])
+        if not docs:
+            return iter(())
+        return _EXTRACTORS[spec[0]](docs, self._props_table.setdefault)
+    
+    def _iter_authored(self) -> Iterator[Rel]:
+        """Yield AUTHORED relationships from Publication.persons"""
+        return self._iter(_SPECS_BY_TYPE['AUTHORED'])
     
-    def _extract_involved_in_relationships(self):
-        """Extract INVOLVED_IN relationships from Project.persons"""
-        for project in self.documents.get('projects', []):
-            project_id = project.get('es_id')
-            if not project_id:
-                continue
-            
-            # Get persons from the project
-            persons = project.get('persons', [])
-            if isinstance(persons, str):
-                try:
-                    persons = json.loads(persons)
-                except:
-                    persons = []
-            
-            for person_data in persons:
-                if isinstance(person_data, dict):
-                    # Person ID is in PersonID field (uppercase ID)
-                    person_id = person_data.get('PersonID')
-                    if person_id:
-                        rel = {
-                            'source_id': person_id,
-                            'target_id': project_id,
-                            'properties': {
-                                'role_id': person_data.get('PersonRoleID', ''),
-                                'role_name_swe': person_data.get('PersonRoleName_sv', ''),
-                                'role_name_eng': person_data.get('PersonRoleName_en', ''),
-                                'organization_id': person_data.get('OrganizationID', '')
-                            }
-                        }
-                        self.relationships['INVOLVED_IN'].append(rel)
+    def _iter_involved_in(self) -> Iterator[Rel]:
+        """Yield INVOLVED_IN relationships from Project.persons"""
+        return self._iter(_SPECS_BY_TYPE['INVOLVED_IN'])
     
-    def _extract_affiliated_relationships(self):
-        """Extract AFFILIATED relationships from Person.organization_home"""
-        for person in self.documents.get('persons', []):
-            person_id = person.get('es_id')
-            if not person_id:
-                continue
-            
-            # Get organization_home from the person
-            org_home = person.get('organization_home', [])
-            if isinstance(org_home, str):
-                try:
-                    org_home = json.loads(org_home)
-                except:
-                    org_home = []
-            
-            for org_data in org_home:
-                if isinstance(org_data, dict):
-                    org_id = org_data.get('OrganizationId') or org_data.get('organization_id')
-                    if org_id:
-                        rel = {
-                            'source_id': person_id,
-                            'target_id': org_id,
-                            'properties': {
-                                'role': org_data.get('Role', ''),
-                                'start_date': org_data.get('StartDate', ''),
-                                'end_date': org_data.get('EndDate', '')
-                            }
-                        }
-                        self.relationships['AFFILIATED'].append(rel)
+    def _iter_affiliated(self) -> Iterator[Rel]:
+        """Yield AFFILIATED relationships from Person.organization_home"""
+        return self._iter(_SPECS_BY_TYPE['AFFILIATED'])
     
-    def _extract_partner_relationships(self):
-        """Extract PARTNER relationships from Project.organizations"""
-        for project in self.documents.get('projects', []):
-            project_id = project.get('es_id')
-            if not project_id:
-                continue
-            
-            # Get organizations from the project
-            organizations = project.get('organizations', [])
-            if isinstance(organizations, str):
-                try:
-                    organizations = json.loads(organizations)
-                except:
-                    organizations = []
-            
-            for org_data in organizations:
-                if isinstance(org_data, dict):
-                    # Organization ID is in OrganizationID field
-                    org_id = org_data.get('OrganizationID')
-                    if org_id:
-                        rel = {
-                            'source_id': org_id,
-                            'target_id': project_id,
-                            'properties': {
-                                'role_id': org_data.get('OrganizationRoleID', ''),
-                                'role_name_swe': org_data.get('OrganizationRoleNameSv', ''),
-                                'role_name_eng': org_data.get('OrganizationRoleNameEn', '')
-                            }
-                        }
-                        self.relationships['PARTNER'].append(rel)
+    def _iter_partner(self) -> Iterator[Rel]:
+        """Yield PARTNER relationships from Project.organizations"""
+        return self._iter(_SPECS_BY_TYPE['PARTNER'])
     
-    def _extract_output_relationships(self):
-        """Extract OUTPUT relationships from Publication.project"""
-        for pub in self.documents.get('publications', []):
-            pub_id = pub.get('es_id')
-            if not pub_id:
-                continue
-            
-            # Get project from the publication
-            project_data = pub.get('project')
-            if isinstance(project_data, str):
-                try:
-                    project_data = json.loads(project_data)
-                except:
-                    project_data = None
-            
-            if isinstance(project_data, dict):
-                project_id = project_data.get('ProjectId') or project_data.get('project_id')
-                if project_id:
-                    rel = {
-                        'source_id': str(project_id),
-                        'target_id': pub_id,
-                        'properties': {}
-                    }
-                    self.relationships['OUTPUT'].append(rel)
+    def _iter_output(self) -> Iterator[Rel]:
+        """Yield OUTPUT relationships from Publication.project"""
+        return self._iter(_SPECS_BY_TYPE['OUTPUT'])
     
-    def _extract_published_in_relationships(self):
-        """Extract PUBLISHED_IN relationships from Publication.series"""
-        for pub in self.documents.get('publications', []):
-            pub_id = pub.get('es_id')
-            if not pub_id:
-                continue
-            
-            # Get series from the publication
-            series = pub.get('series')
-            if isinstance(series, str):
-                try:
-                    series = json.loads(series)
-                except:
-                    series = None
-            
-            # Series is a list of series items
-            if isinstance(series, list):
-                for series_item in series:
-                    if isinstance(series_item, dict):
-                        serial_data = series_item.get('SerialItem', {})
-                        serial_id = serial_data.get('Id')
-                        if serial_id:
-                            rel = {
-                                'source_id': pub_id,
-                                'target_id': serial_id,
-                                'properties': {
-                                    'serial_number': series_item.get('SerialNumber', '')
-                                }
-                            }
-                            self.relationships['PUBLISHED_IN'].append(rel)
+    def _iter_published_in(self) -> Iterator[Rel]:
+        """Yield PUBLISHED_IN relationships from Publication.series"""
+        return self._iter(_SPECS_BY_TYPE['PUBLISHED_IN'])
     
-    def _extract_parent_of_relationships(self):
-        """Extract PARENT_OF relationships from Organization.organization_parents"""
-        for org in self.documents.get('organizations', []):
-            org_id = org.get('es_id')
-            if not org_id:
-                continue
-            
-            # Get organization_parents
-            org_parents = org.get('organization_parents', [])
-            if isinstance(org_parents, str):
-                try:
-                    org_parents = json.loads(org_parents)
-                except:
-                    org_parents = []
-            
-            for parent_data in org_parents:
-                if isinstance(parent_data, dict):
-                    parent_id = parent_data.get('OrganizationId') or parent_data.get('organization_id')
-                    if parent_id:
-                        rel = {
-                            'source_id': parent_id,
-                            'target_id': org_id,
-                            'properties': {
-                                'level': parent_data.get('Level', 0)
-                            }
-                        }
-                        self.relationships['PARENT_OF'].append(rel)
+    def _iter_parent_of(self) -> Iterator[Rel]:
+        """Yield PARENT_OF relationships from Organization.organization_parents"""
+        return self._iter(_SPECS_BY_TYPE['PARENT_OF'])
 
 class StreamingRelationshipExtractor:
     def __init__(self, neo4j_conn, es_client, batch_size: int = 1000):
@@ -286,16 +346,11 @@ class StreamingRelationshipExtractor:
         """Process relationships for a specific entity type"""
         extractor = self._get_extractor(source_type)
         
-        for batch in extractor.extract_batches():
-            relationships = []
-            
-            for doc in batch:
-                # Extract relationships from this document
-                doc_relationships = self._extract_doc_relationships(
-                    doc, source_type, rel_types
-                )
-                relationships.extend(doc_relationships)
-            
-            # Import relationships batch
-            if relationships:
-                self._import_relationship_batch(relationships)
\ No newline at end of file
+        # Relationships stream straight from the scroll batches; only one
+        # import batch is held at a time
+        docs = chain.from_iterable(extractor.extract_batches())
+        relationships = chain.from_iterable(
+            self._extract_doc_relationships(doc, source_type, rel_types) for doc in docs
+        )
+        while chunk := list(islice(relationships, self.batch_size)):
+            self._import_relationship_batch(chunk)
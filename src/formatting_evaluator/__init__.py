@@ -5,14 +5,29 @@ This module provides tools for evaluating and validating document formatting
 transformations without requiring database operations.
 """
 
-from .sample_extractor import SampleExtractor
-from .document_formatter import DocumentFormatter
-from .compatibility_validator import CompatibilityValidator
-from .formatting_evaluator import FormattingEvaluator
+import importlib
+
+# Exports are imported on first access, so callers that only need the sample
+# cache don't load the Elasticsearch/Neo4j stack behind the formatter
+_EXPORTS = {
+    'SampleExtractor': '.sample_extractor',
+    'DocumentFormatter': '.document_formatter',
+    'CompatibilityValidator': '.compatibility_validator',
+    'FormattingEvaluator': '.formatting_evaluator',
+}
 
 __all__ = [
     'SampleExtractor',
     'DocumentFormatter', 
     'CompatibilityValidator',
     'FormattingEvaluator'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -4,6 +4,7 @@ CLI commands for formatting evaluation
 
 import argparse
 import sys
+from functools import cached_property
 from pathlib import Path
 
 from .formatting_evaluator import FormattingEvaluator
@@ -219,8 +220,8 @@ class FormattingEvaluatorCLI:
             print(f"❌ Formatting failed: {format_result.error_message}")
             return {'success': False, 'error': format_result.error_message}
     
-    def run(self):
-        """Main CLI entry point"""
+    def _build_parser(self) -> argparse.ArgumentParser:
+        """Build the argument parser; each subparser carries its handler."""
         parser = argparse.ArgumentParser(
             description="Document Formatting Evaluation CLI",
             formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -252,6 +253,7 @@ Examples:
         eval_parser.add_argument('--samples', type=int, default=5, help='Number of samples per type (default: 5)')
         eval_parser.add_argument('--force-refresh', action='store_true', help='Force refresh of samples from ES')
         eval_parser.add_argument('--detailed', action='store_true', help='Show detailed formatting results')
+        eval_parser.set_defaults(handler=self.cmd_evaluate)
         
         # Extract samples command
         extract_parser = subparsers.add_parser('extract-samples', help='Extract and cache samples from ES')
@@ -259,65 +261,68 @@ Examples:
                                    help='Entity type to extract')
         extract_parser.add_argument('--samples', type=int, default=10, help='Number of samples to extract (default: 10)')
         extract_parser.add_argument('--force-refresh', action='store_true', help='Force refresh even if cache exists')
+        extract_parser.set_defaults(handler=self.cmd_extract_samples)
         
         # List cache command
-        subparsers.add_parser('list-cache', help='List cached samples')
+        subparsers.add_parser('list-cache', help='List cached samples').set_defaults(handler=self.cmd_list_cache)
         
         # Clear cache command
         clear_parser = subparsers.add_parser('clear-cache', help='Clear cached samples')
         clear_parser.add_argument('entity_type', choices=['all', 'persons', 'organizations', 'publications', 'projects', 'serials'],
                                  help='Entity type to clear (or all)')
+        clear_parser.set_defaults(handler=self.cmd_clear_cache)
         
         # Validate only command
         validate_parser = subparsers.add_parser('validate-only', help='Run validation on cached samples')
         validate_parser.add_argument('entity_type', choices=['persons', 'organizations', 'publications', 'projects', 'serials'],
                                     help='Entity type to validate')
         validate_parser.add_argument('--detailed', action='store_true', help='Show detailed validation results')
+        validate_parser.set_defaults(handler=self.cmd_validate_only)
         
         # Compare samples command
         compare_parser = subparsers.add_parser('compare', help='Compare raw vs formatted documents')
         compare_parser.add_argument('entity_type', choices=['persons', 'organizations', 'publications', 'projects', 'serials'],
                                    help='Entity type to compare')
         compare_parser.add_argument('--count', type=int, default=3, help='Number of samples to compare (default: 3)')
+        compare_parser.set_defaults(handler=self.cmd_compare_samples)
         
         # Save report command
         report_parser = subparsers.add_parser('save-report', help='Save evaluation report to file')
         report_parser.add_argument('entity_type', choices=['all', 'persons', 'organizations', 'publications', 'projects', 'serials'],
                                   help='Entity type to save (or all)')
         report_parser.add_argument('--filename', help='Custom filename for report')
+        report_parser.set_defaults(handler=self.cmd_save_report)
         
         # Test formatter command
         test_parser = subparsers.add_parser('test-formatter', help='Test formatter with a single sample')
         test_parser.add_argument('entity_type', choices=['persons', 'organizations', 'publications', 'projects', 'serials'],
                                 help='Entity type to test')
+        test_parser.set_defaults(handler=self.cmd_test_formatter)
         
-        args = parser.parse_args()
+        return parser
+    
+    @cached_property
+    def _parser(self) -> argparse.ArgumentParser:
+        """Argument parser, reused by every run() on this instance."""
+        return self._build_parser()
+    
+    def run(self, argv=None):
+        """Main CLI entry point"""
+        parser = self._parser
+        args = parser.parse_args(argv)
         
         if not args.command:
             parser.print_help()
             return 1
         
+        handler = getattr(args, 'handler', None)
+        if handler is None:
+            print(f"❌ Unknown command: {args.command}")
+            return 1
+        
         # Route commands
         try:
-            if args.command == 'evaluate':
-                result = self.cmd_evaluate(args)
-            elif args.command == 'extract-samples':
-                result = self.cmd_extract_samples(args)
-            elif args.command == 'list-cache':
-                result = self.cmd_list_cache(args)
-            elif args.command == 'clear-cache':
-                result = self.cmd_clear_cache(args)
-            elif args.command == 'validate-only':
-                result = self.cmd_validate_only(args)
-            elif args.command == 'compare':
-                result = self.cmd_compare_samples(args)
-            elif args.command == 'save-report':
-                result = self.cmd_save_report(args)
-            elif args.command == 'test-formatter':
-                result = self.cmd_test_formatter(args)
-            else:
-                print(f"❌ Unknown command: {args.command}")
-                return 1
+            result = handler(args)
             
             return 0 if result.get('success', True) else 1
             
@@ -3,6 +3,7 @@ GraphDB compatibility validation for formatted documents.
 """
 
 import json
+from collections import Counter
 from typing import Dict, List, Any, Optional, Set
 
 
@@ -216,7 +217,7 @@ class CompatibilityValidator:
             return batch_result
         
         # Track common issues
-        issue_counts = {}
+        issue_counts = Counter()
         total_stats = {
             'required_fields': 0,
             'recommended_fields': 0,
@@ -245,10 +246,8 @@ class CompatibilityValidator:
             total_stats['warnings'] += len(validation['warnings'])
             
             # Track common issues
-            for error in validation['errors']:
-                issue_counts[error] = issue_counts.get(error, 0) + 1
-            for warning in validation['warnings']:
-                issue_counts[warning] = issue_counts.get(warning, 0) + 1
+            issue_counts.update(validation['errors'])
+            issue_counts.update(validation['warnings'])
         
         # Calculate averages
         doc_count = len(documents)
@@ -261,7 +260,6 @@ class CompatibilityValidator:
         }
         
         # Identify most common issues
-        sorted_issues = sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)
-        batch_result['common_issues'] = dict(sorted_issues[:10])  # Top 10 issues
+        batch_result['common_issues'] = dict(issue_counts.most_common(10))  # Top 10 issues
         
         return batch_result
\ No newline at end of file
@@ -43,34 +43,36 @@ class DocumentFormatter:
     
     def _analyze_transformations(self, original: Dict[str, Any], formatted: Dict[str, Any], format_time: float) -> Dict[str, Any]:
         """Analyze what transformations occurred during formatting."""
-        original_fields = set(original.keys())
-        formatted_fields = set(formatted.keys())
+        # Key views support set algebra directly, without copying into sets
+        original_fields = original.keys()
+        formatted_fields = formatted.keys()
         
         added_fields = formatted_fields - original_fields
         removed_fields = original_fields - formatted_fields
-        common_fields = original_fields & formatted_fields
         
         transformed_fields = []
         type_changes = []
         
-        for field in common_fields:
+        for field in original_fields & formatted_fields:
             orig_val = original[field]
             form_val = formatted[field]
             
             if orig_val != form_val:
+                orig_type = type(orig_val)
+                form_type = type(form_val)
                 transformed_fields.append({
                     'field': field,
                     'original': self._safe_repr(orig_val),
                     'formatted': self._safe_repr(form_val),
-                    'original_type': type(orig_val).__name__,
-                    'formatted_type': type(form_val).__name__
+                    'original_type': orig_type.__name__,
+                    'formatted_type': form_type.__name__
                 })
                 
-                if type(orig_val) != type(form_val):
+                if orig_type is not form_type:
                     type_changes.append({
                         'field': field,
-                        'from_type': type(orig_val).__name__,
-                        'to_type': type(form_val).__name__
+                        'from_type': orig_type.__name__,
+                        'to_type': form_type.__name__
                     })
         
         return {
@@ -18,11 +18,19 @@ class FormattingEvaluator:
         self.document_formatter = DocumentFormatter()
     
     def evaluate_entity_type(self, entity_type: str, sample_count: int = 10, 
-                           detailed: bool = False, use_cache: bool = True) -> Dict[str, Any]:
-        """Complete evaluation of formatting for an entity type."""
+                           detailed: bool = False, use_cache: bool = True,
+                           samples: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Complete evaluation of formatting for an entity type.
+        
+        Pass samples to evaluate already-fetched documents without touching
+        the cache or Elasticsearch.
+        """
         
         # Get samples
-        if use_cache and self.sample_extractor:
+        if samples is not None:
+            pass
+        elif use_cache and self.sample_extractor:
             samples = self.sample_extractor.get_cached_samples(entity_type)
             if not samples or len(samples) < sample_count:
                 if self.es_client:
@@ -152,8 +160,15 @@ class FormattingEvaluator:
         
         return results
     
-    def quick_test_single_sample(self, entity_type: str, sample_index: int = 0) -> Dict[str, Any]:
-        """Quick test of a single sample for development workflow."""
+    def quick_test_single_sample(self, entity_type: str, sample_index: int = 0,
+                                 include_docs: bool = False) -> Dict[str, Any]:
+        """
+        Quick test of a single sample for development workflow.
+        
+        The summary counts come from the formatter's own analysis; set
+        include_docs to also return both documents and the field-by-field
+        comparison, which is the expensive part.
+        """
         
         # Get cached sample
         if not self.sample_extractor:
@@ -171,18 +186,10 @@ class FormattingEvaluator:
                 sample['source'], entity_type
             )
             
-            # Compare original vs formatted
-            comparison = self.document_formatter.compare_documents(
-                sample['source'], formatted
-            )
-            
-            return {
+            result = {
                 'sample_id': sample['id'],
                 'entity_type': entity_type,
-                'original_document': sample['source'],
-                'formatted_document': formatted,
                 'formatting_analysis': analysis,
-                'comparison': comparison,
                 'summary': {
                     'format_time_ms': analysis['format_time_ms'],
                     'fields_changed': len(analysis['transformed_fields']),
@@ -191,6 +198,16 @@ class FormattingEvaluator:
                 }
             }
             
+            if include_docs:
+                result['original_document'] = sample['source']
+                result['formatted_document'] = formatted
+                # Compare original vs formatted
+                result['comparison'] = self.document_formatter.compare_documents(
+                    sample['source'], formatted
+                )
+            
+            return result
+            
         except Exception as e:
             return {
                 'sample_id': sample['id'],
@@ -2,13 +2,23 @@
 Sample extraction and caching for formatting evaluation.
 """
 
-import json
 import os
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
 
-from es_client.client import ElasticsearchClient
+from json_utils import dumps_bytes, loads
+
+if TYPE_CHECKING:
+    from es_client.client import ElasticsearchClient
+
+
+@lru_cache(maxsize=8)
+def _parse_cache_file(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a cache file; keyed on mtime/size so a rewrite invalidates the entry."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
 
 
 class SampleExtractor:
@@ -22,31 +32,161 @@ class SampleExtractor:
         'serials': 'research-serials-static'
     }
     
-    def __init__(self, es_client: ElasticsearchClient, cache_dir: str = "data/formatting_samples"):
+    def __init__(self, es_client: Optional['ElasticsearchClient'], cache_dir: str = "data/formatting_samples"):
         self.es_client = es_client
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
     
     def extract_samples(self, entity_type: str, count: int = 10, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """Extract sample documents for an entity type."""
-        cache_file = os.path.join(self.cache_dir, f"{entity_type}_samples.json")
-        
         # Check cache first
-        if not force_refresh and os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                    if len(cached_data.get('samples', [])) >= count:
-                        print(f"Using cached samples for {entity_type}")
-                        return cached_data['samples'][:count]
-            except (json.JSONDecodeError, KeyError):
-                pass
+        if not force_refresh:
+            cached = self._load_cached_samples(entity_type, count)
+            if cached is not None:
+                print(f"Using cached samples for {entity_type}")
+                return cached
         
         # Extract fresh samples
         print(f"Extracting {count} samples for {entity_type} from ES...")
         samples = self._extract_from_es(entity_type, count)
         
-        # Cache the results
+        self._write_cache(entity_type, samples)
+        return samples
+    
+    def extract_samples_multi(self, entity_types: List[str], count: int = 10,
+                              force_refresh: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """Extract samples for several entity types with a single _msearch request."""
+        results = {}
+        to_fetch = []
+        
+        for entity_type in entity_types:
+            if entity_type not in self.ENTITY_INDEX_MAP:
+                raise ValueError(f"Unknown entity type: {entity_type}")
+            if not force_refresh:
+                cached = self._load_cached_samples(entity_type, count)
+                if cached is not None:
+                    print(f"Using cached samples for {entity_type}")
+                    results[entity_type] = cached
+                    continue
+            to_fetch.append(entity_type)
+        
+        if not to_fetch:
+            return results
+        
+        print(f"Extracting {count} samples each for {', '.join(to_fetch)} from ES...")
+        body = []
+        for entity_type in to_fetch:
+            body.append({'index': self.ENTITY_INDEX_MAP[entity_type]})
+            body.append(self._build_sample_query(count))
+        
+        try:
+            responses = self.es_client.msearch(body)['responses']
+        except Exception as e:
+            print(f"Error extracting samples via msearch: {e}")
+            responses = [{'error': str(e)}] * len(to_fetch)
+        
+        for entity_type, response in zip(to_fetch, responses):
+            if 'error' in response:
+                print(f"Error extracting {entity_type} samples: {response['error']}")
+                # Keep whatever is cached rather than overwriting it with nothing
+                results[entity_type] = self.get_cached_samples(entity_type) or []
+                continue
+            samples = self._hits_to_samples(response)
+            self._write_cache(entity_type, samples)
+            results[entity_type] = samples
+        
+        return results
+    
+    def refresh_samples_multi(self, entity_types: List[str], count: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Re-fetch the cached sample ids of several entity types with one _mget.
+        
+        Only types whose cache holds at least count samples are returned;
+        ids that no longer exist in ES are dropped. If the _mget fails, the
+        cached samples are returned as they are.
+        """
+        wanted = {}
+        docs = []
+        for entity_type in entity_types:
+            cached = self._load_cached_samples(entity_type, count)
+            if cached is None:
+                continue
+            index_name = self.ENTITY_INDEX_MAP[entity_type]
+            wanted[entity_type] = cached
+            docs.extend({'_index': index_name, '_id': sample['id']} for sample in cached)
+        
+        if not docs:
+            return {}
+        
+        try:
+            found = self.es_client.mget(docs)['docs']
+        except Exception as e:
+            print(f"Error refreshing samples via mget, using cached copies: {e}")
+            return wanted
+        
+        # mget preserves request order, so slice the flat response back per type
+        results = {}
+        offset = 0
+        for entity_type, cached in wanted.items():
+            n = len(cached)
+            results[entity_type] = [
+                {'id': doc['_id'], 'source': doc['_source']}
+                for doc in found[offset:offset + n]
+                if doc.get('found')
+            ]
+            offset += n
+        
+        return results
+    
+    def _build_sample_query(self, count: int) -> Dict[str, Any]:
+        """Build a random-scored query returning count diverse documents."""
+        # Only the hits are used, so ES needn't count every match
+        return {
+            "query": {
+                "function_score": {
+                    "query": {"match_all": {}},
+                    "random_score": {"seed": int(time.time())}
+                }
+            },
+            "size": count,
+            "track_total_hits": False
+        }
+    
+    def _hits_to_samples(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert a search response into cached sample records."""
+        return [
+            {'id': hit['_id'], 'source': hit['_source']}
+            for hit in result['hits']['hits']
+        ]
+    
+    def _read_cache(self, entity_type: str, stat: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the parsed cache file for an entity type, or None if it is missing.
+        
+        Parsed files are kept in-process until they change on disk. Raises
+        ValueError if the file is corrupted.
+        """
+        cache_file = os.path.join(self.cache_dir, f"{entity_type}_samples.json")
+        if stat is None:
+            try:
+                stat = os.stat(cache_file)
+            except FileNotFoundError:
+                return None
+        return _parse_cache_file(cache_file, stat.st_mtime_ns, stat.st_size)
+    
+    def _load_cached_samples(self, entity_type: str, count: int) -> Optional[List[Dict[str, Any]]]:
+        """Return count cached samples, or None if the cache cannot satisfy the request."""
+        try:
+            cached_data = self._read_cache(entity_type)
+            if cached_data is not None and len(cached_data.get('samples', [])) >= count:
+                return cached_data['samples'][:count]
+        except (ValueError, KeyError):
+            pass
+        return None
+    
+    def _write_cache(self, entity_type: str, samples: List[Dict[str, Any]]):
+        """Write samples to the cache file for an entity type."""
+        cache_file = os.path.join(self.cache_dir, f"{entity_type}_samples.json")
         cache_data = {
             'entity_type': entity_type,
             'extracted_at': datetime.now().isoformat(),
@@ -54,11 +194,10 @@ class SampleExtractor:
             'samples': samples
         }
         
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f, indent=2)
+        with open(cache_file, 'wb') as f:
+            f.write(dumps_bytes(cache_data, indent=True))
         
         print(f"Cached {len(samples)} {entity_type} samples")
-        return samples
     
     def _extract_from_es(self, entity_type: str, count: int) -> List[Dict[str, Any]]:
         """Extract samples from Elasticsearch."""
@@ -68,26 +207,8 @@ class SampleExtractor:
         
         try:
             # Get diverse samples using random scoring
-            query = {
-                "query": {
-                    "function_score": {
-                        "query": {"match_all": {}},
-                        "random_score": {"seed": int(time.time())}
-                    }
-                },
-                "size": count
-            }
-            
-            result = self.es_client.search(index_name, query)
-            
-            samples = []
-            for hit in result['hits']['hits']:
-                samples.append({
-                    'id': hit['_id'],
-                    'source': hit['_source']
-                })
-            
-            return samples
+            result = self.es_client.search(index_name, self._build_sample_query(count))
+            return self._hits_to_samples(result)
             
         except Exception as e:
             print(f"Error extracting {entity_type} samples: {e}")
@@ -95,17 +216,11 @@ class SampleExtractor:
     
     def get_cached_samples(self, entity_type: str) -> Optional[List[Dict[str, Any]]]:
         """Get cached samples if available."""
-        cache_file = os.path.join(self.cache_dir, f"{entity_type}_samples.json")
-        
-        if not os.path.exists(cache_file):
-            return None
-            
         try:
-            with open(cache_file, 'r') as f:
-                cached_data = json.load(f)
-                return cached_data.get('samples', [])
-        except (json.JSONDecodeError, KeyError):
+            cached_data = self._read_cache(entity_type)
+        except ValueError:
             return None
+        return cached_data.get('samples', []) if cached_data is not None else None
     
     def get_cache_info(self) -> Dict[str, Any]:
         """Get information about cached samples."""
@@ -114,19 +229,22 @@ class SampleExtractor:
         for entity_type in self.ENTITY_INDEX_MAP.keys():
             cache_file = os.path.join(self.cache_dir, f"{entity_type}_samples.json")
             
-            if os.path.exists(cache_file):
-                try:
-                    with open(cache_file, 'r') as f:
-                        cached_data = json.load(f)
-                        cache_info[entity_type] = {
-                            'count': cached_data.get('count', 0),
-                            'extracted_at': cached_data.get('extracted_at', 'unknown'),
-                            'file_size': os.path.getsize(cache_file)
-                        }
-                except (json.JSONDecodeError, KeyError):
-                    cache_info[entity_type] = {'error': 'corrupted cache'}
-            else:
+            # One stat per file serves both the existence check and the size
+            try:
+                stat = os.stat(cache_file)
+            except FileNotFoundError:
                 cache_info[entity_type] = {'status': 'not cached'}
+                continue
+            
+            try:
+                cached_data = self._read_cache(entity_type, stat)
+                cache_info[entity_type] = {
+                    'count': cached_data.get('count', 0),
+                    'extracted_at': cached_data.get('extracted_at', 'unknown'),
+                    'file_size': stat.st_size
+                }
+            except (ValueError, KeyError, AttributeError):
+                cache_info[entity_type] = {'error': 'corrupted cache'}
         
         return cache_info
     
@@ -143,4 +261,4 @@ class SampleExtractor:
                 cache_file = os.path.join(self.cache_dir, f"{et}_samples.json")
                 if os.path.exists(cache_file):
                     os.remove(cache_file)
-            print("Cleared all sample caches")
\ No newline at end of file
+            print("Cleared all sample caches")
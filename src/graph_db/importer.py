@@ -3,12 +3,14 @@ Phase-based import pipeline for Neo4j Graph RAG
 """
 
 import time
-import json
+from itertools import islice
 from typing import Dict, List, Any, Optional, Iterator, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 
+from json_utils import dumps as _dumps
+
 from .connection import Neo4jConnection
 from .schema import SchemaManager
 from .db_manager import DatabaseManager
@@ -109,9 +111,9 @@ class ImportPipeline:
             prepared_node = {}
             for key, value in node.items():
                 if isinstance(value, list):
-                    prepared_node[key] = json.dumps(value) if value else "[]"
+                    prepared_node[key] = _dumps(value) if value else "[]"
                 elif isinstance(value, dict):
-                    prepared_node[key] = json.dumps(value) if value else "{}"
+                    prepared_node[key] = _dumps(value) if value else "{}"
                 elif value is None:
                     prepared_node[key] = ""
                 else:
@@ -131,11 +133,15 @@ class ImportPipeline:
         return result.single()["created"]
     
     def _create_relationships_batch(self, session, rel_type: str, 
-                                  relationships: List[Dict[str, Any]]) -> int:
-        """Create a batch of relationships"""
+                                  relationships: List[Any]) -> int:
+        """Create a batch of relationships from dicts or Rel records"""
         if not relationships:
             return 0
         
+        # Compact Rel records from RelationshipExtractor become dicts only here
+        if not isinstance(relationships[0], dict):
+            relationships = [rel.to_dict() for rel in relationships]
+        
         query = f"""
         UNWIND $rels AS rel
         MATCH (source {{es_id: rel.source_id}})
@@ -171,26 +177,15 @@ class ImportPipeline:
         
         try:
             with self.connection.get_session() as session:
-                batch = []
                 batch_num = 0
                 
-                for node in nodes_iterator:
-                    batch.append(node)
-                    
-                    if len(batch) >= self.batch_size:
-                        batch_num += 1
-                        progress.current_batch = batch_num
-                        
-                        created = self._create_nodes_batch(session, node_type, batch)
-                        progress.processed_items += created
-                        self._update_progress(progress)
-                        
-                        batch = []
-                
-                # Process final batch
-                if batch:
+                # islice fills each batch in C; the last one may be short.
+                # iter() so a list argument is consumed rather than re-sliced
+                nodes_iterator = iter(nodes_iterator)
+                while batch := list(islice(nodes_iterator, self.batch_size)):
                     batch_num += 1
                     progress.current_batch = batch_num
+                    
                     created = self._create_nodes_batch(session, node_type, batch)
                     progress.processed_items += created
                     self._update_progress(progress)
@@ -223,26 +218,15 @@ class ImportPipeline:
         
         try:
             with self.connection.get_session() as session:
-                batch = []
                 batch_num = 0
                 
-                for rel in rels_iterator:
-                    batch.append(rel)
-                    
-                    if len(batch) >= self.batch_size:
-                        batch_num += 1
-                        progress.current_batch = batch_num
-                        
-                        created = self._create_relationships_batch(session, rel_type, batch)
-                        progress.processed_items += created
-                        self._update_progress(progress)
-                        
-                        batch = []
-                
-                # Process final batch
-                if batch:
+                # islice fills each batch in C; the last one may be short.
+                # iter() so a list argument is consumed rather than re-sliced
+                rels_iterator = iter(rels_iterator)
+                while batch := list(islice(rels_iterator, self.batch_size)):
                     batch_num += 1
                     progress.current_batch = batch_num
+                    
                     created = self._create_relationships_batch(session, rel_type, batch)
                     progress.processed_items += created
                     self._update_progress(progress)
@@ -368,7 +352,8 @@ class ImportPipeline:
             print(f"🔍 Validating {data_type} data...")
             
             # Sample the data
-            sample_data = list(data)[:sample_size] if hasattr(data, '__iter__') else []
+            # islice so generators are only consumed up to the sample size
+            sample_data = list(islice(data, sample_size)) if hasattr(data, '__iter__') else []
             
             # Validate structure
             required_fields = self._get_required_fields(data_type)
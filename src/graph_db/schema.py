@@ -167,13 +167,16 @@ class SchemaManager:
             indexes_result = session.run("SHOW INDEXES")
             indexes = [dict(record) for record in indexes_result]
             
-            # Get node labels
-            labels_result = session.run("CALL db.labels()")
-            labels = [record["label"] for record in labels_result]
-            
-            # Get relationship types
-            rel_types_result = session.run("CALL db.relationshipTypes()")
-            rel_types = [record["relationshipType"] for record in rel_types_result]
+            # Get node labels and relationship types in one round-trip; each
+            # subquery aggregates without grouping, so it always returns a row
+            tokens = session.run("""
+                CALL { CALL db.labels() YIELD label RETURN collect(label) AS labels }
+                CALL { CALL db.relationshipTypes() YIELD relationshipType
+                       RETURN collect(relationshipType) AS rel_types }
+                RETURN labels, rel_types
+            """).single()
+            labels = tokens["labels"]
+            rel_types = tokens["rel_types"]
         
         return {
             "constraints": constraints,
@@ -6,17 +6,26 @@ Handles large datasets without loading all data into memory
 import time
 import json
 import os
-from typing import Dict, List, Any, Optional, Generator, Set
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Generator, Set, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 from elasticsearch.exceptions import ConnectionTimeout, ConnectionError, TransportError
+from neo4j.exceptions import TransientError
+
+from json_utils import dumps as _dumps
 
 from .connection import Neo4jConnection
 from .schema import SchemaManager
 from .db_manager import DatabaseManager
 from src.es_client.base_extractor import BaseStreamingExtractor
 
+# Default for optional sub-objects (Role, SerialItem, Type) that are only
+# read; shared so a missing one doesn't allocate a dict. Never mutate it.
+_EMPTY: Dict[str, Any] = {}
+
 
 class ImportPhase(Enum):
     """Import phases in dependency order"""
@@ -92,6 +101,11 @@ class StreamingProgress:
 class StreamingImportPipeline:
     """Streaming import pipeline that processes data in batches"""
     
+    # Minimum seconds between progress-line redraws while importing batches
+    PROGRESS_INTERVAL = 0.1
+    # Node write transactions allowed in flight while the next batch is fetched
+    WRITE_WORKERS = 4
+    
     def __init__(self, connection: Neo4jConnection, batch_size: int = 1000):
         self.connection = connection
         self.batch_size = batch_size
@@ -100,6 +114,7 @@ class StreamingImportPipeline:
         self.import_session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.node_id_cache = {}  # Cache for relationship validation
         self.checkpoint_file = f"data/import_checkpoint_{self.import_session_id}.json"
+        self.entity_summary = []  # (entity_type, imported, seconds) per completed type
     
     def _save_checkpoint(self, completed_entities: List[str], current_entity: str = None, 
                         processed_items: int = 0):
@@ -210,6 +225,15 @@ class StreamingImportPipeline:
             ('publications', 'Publication', '📄')
         ]
         
+        # Prefetching extractors start lazily; each pending type starts the
+        # next one's scroll only once its own has been read to the end, so a
+        # prefetched scroll never waits out a whole import past its keep-alive
+        pending_keys = [key for key, _, _ in import_order
+                        if key in extractors and key not in completed_entities]
+        for key, next_key in zip(pending_keys, pending_keys[1:]):
+            if hasattr(extractors[key], 'prefetch_next'):
+                extractors[key].prefetch_next(extractors[next_key])
+        
         for extractor_key, node_label, emoji in import_order:
             if extractor_key not in extractors:
                 print(f"⚠️ No {extractor_key} extractor provided, skipping")
@@ -237,9 +261,14 @@ class StreamingImportPipeline:
                 
                 # Sequential processing safeguards
                 if extractor_key != 'publications':  # Don't delay after last entity
-                    # Clean up any lingering scroll contexts between entity types
-                    es_client = extractors[extractor_key].es_client
-                    if hasattr(es_client, 'clear_all_scroll_contexts'):
+                    # Clean up any lingering scroll contexts between entity types.
+                    # With prefetching the next type is already scrolling, so
+                    # only this type's scroll may be released, never '_all'.
+                    finished = extractors[extractor_key]
+                    es_client = finished.es_client
+                    if hasattr(finished, 'stop_prefetch'):
+                        finished.stop_prefetch()
+                    elif hasattr(es_client, 'clear_all_scroll_contexts'):
                         print("  🧹 Cleaning up scroll contexts between entity types...")
                         es_client.clear_all_scroll_contexts()
                     
@@ -249,6 +278,9 @@ class StreamingImportPipeline:
             
             print()
         
+        if self.entity_summary:
+            self._print_entity_summary()
+        
         # Phase 7: Import relationships
         if enable_relationships:
             print("🔗 Phase 7: Importing Relationships")
@@ -288,6 +320,17 @@ class StreamingImportPipeline:
     
     
 
+    def _print_entity_summary(self):
+        """Print one table of per-type node import results"""
+        lines = ["📋 Node Import Summary",
+                 f"  {'Entity type':<14} {'Imported':>12} {'Time':>8} {'Items/sec':>10}"]
+        for entity_type, imported, seconds in self.entity_summary:
+            rate = imported / seconds if seconds > 0 else 0.0
+            lines.append(
+                f"  {entity_type:<14} {imported:>12,} {int(seconds // 60):>5}:{int(seconds % 60):02d} {rate:>10,.0f}"
+            )
+        print("\n".join(lines) + "\n")
+    
     def _import_entity_stream(self, entity_type: str, node_label: str, 
                             extractor: BaseStreamingExtractor,
                             sample_mode: bool, sample_size: int) -> bool:
@@ -319,6 +362,7 @@ class StreamingImportPipeline:
                 
                 items_processed = 0
                 last_successful_batch = 0
+                last_redraw = 0.0
                 
                 # Track items processed across retries with different batch sizes
                 if attempt > 0:
@@ -326,73 +370,85 @@ class StreamingImportPipeline:
                     items_processed = getattr(self, '_last_processed_count', 0)
                     print(f"  🔄 Resuming from {items_processed:,} items processed")
                 
-                # Process in batches
-                for batch_num, batch in enumerate(extractor.extract_batches(), 1):
-                    # Skip already processed items when retrying with different batch size
-                    if attempt > 0 and items_processed > 0:
-                        # Calculate how many batches to skip based on items already processed
-                        items_in_batch = len(batch)
-                        if items_processed >= items_in_batch:
-                            items_processed -= items_in_batch
-                            continue
-                        elif items_processed > 0:
-                            # Partial batch - skip processed items
-                            batch = batch[items_processed:]
-                            items_processed = 0
+                # Writes are settled in submission order, so the resume count
+                # only ever covers a prefix of the stream
+                pending = deque()
+                
+                def settle_oldest():
+                    progress.processed_items += pending.popleft().result()
+                    # Save progress for potential retry
+                    self._last_processed_count = progress.processed_items
+                
+                with ThreadPoolExecutor(max_workers=self.WRITE_WORKERS) as writer:
+                    # Process in batches
+                    for batch_num, batch in enumerate(extractor.extract_batches(), 1):
+                        # Skip already processed items when retrying with different batch size
+                        if attempt > 0 and items_processed > 0:
+                            # Calculate how many batches to skip based on items already processed
+                            items_in_batch = len(batch)
+                            if items_processed >= items_in_batch:
+                                items_processed -= items_in_batch
+                                continue
+                            elif items_processed > 0:
+                                # Partial batch - skip processed items
+                                batch = batch[items_processed:]
+                                items_processed = 0
                         
-                    if sample_mode and items_processed >= sample_size:
-                        break
-                    
-                    # Limit batch if in sample mode
-                    if sample_mode and items_processed + len(batch) > sample_size:
-                        batch = batch[:sample_size - items_processed]
-                    
-                    progress.current_batch = batch_num
-                    
-                    # Format documents for Neo4j
-                    formatted_batch = []
-                    for doc in batch:
-                        formatted_doc = self._format_document(entity_type, doc)
-                        if formatted_doc:
-                            formatted_batch.append(formatted_doc)
-                            # Cache ID for relationship processing
-                            self._cache_node_id(entity_type, formatted_doc['es_id'])
-                    
-                    # Import batch to Neo4j with smaller sub-batches if needed
-                    if formatted_batch:
-                        # Split large batches to avoid memory issues
-                        SUB_BATCH_SIZE = 500
-                        for i in range(0, len(formatted_batch), SUB_BATCH_SIZE):
-                            sub_batch = formatted_batch[i:i + SUB_BATCH_SIZE]
-                            imported = self._import_nodes_batch_with_retry(node_label, sub_batch)
-                            progress.processed_items += imported
+                        if sample_mode and items_processed >= sample_size:
+                            break
                         
-                        items_processed += len(batch)
-                        last_successful_batch = batch_num
-                        # Save progress for potential retry
-                        self._last_processed_count = progress.processed_items
-                    
-                    # Update progress
-                    print(f"\r  📈 {progress.get_progress_string()}", end='', flush=True)
-                    
-                    # Add inter-batch delay to reduce ES pressure (skip for sample mode)
-                    if not sample_mode and batch_num > 1:
-                        # Adaptive delay based on entity type complexity
-                        delay_map = {
-                            'organizations': 1.0,  # Simple docs
-                            'persons': 2.0,        # Medium complexity
-                            'serials': 1.0,        # Simple docs
-                            'projects': 3.0,       # Complex nested data
-                            'publications': 2.0    # Medium complexity
-                        }
-                        delay = delay_map.get(entity_type, 2.0)
-                        time.sleep(delay)
-                    
-                    if sample_mode and items_processed >= sample_size:
-                        break
+                        # Limit batch if in sample mode
+                        if sample_mode and items_processed + len(batch) > sample_size:
+                            batch = batch[:sample_size - items_processed]
+                        
+                        progress.current_batch = batch_num
+                        
+                        # Format documents for Neo4j and cache their IDs for relationship processing
+                        formatted_batch = self._format_batch(entity_type, batch)
+                        self._cache_node_ids(entity_type, formatted_batch)
+                        
+                        # Queue one UNWIND write per batch_size nodes; writes run in the
+                        # background while the next ES batch is fetched
+                        if formatted_batch:
+                            for i in range(0, len(formatted_batch), self.batch_size):
+                                pending.append(writer.submit(
+                                    self._import_nodes_batch_with_retry,
+                                    node_label, formatted_batch[i:i + self.batch_size]
+                                ))
+                                while len(pending) > self.WRITE_WORKERS:
+                                    settle_oldest()
+                        
+                            items_processed += len(batch)
+                            last_successful_batch = batch_num
+                        
+                        # Update progress, redrawing at most every PROGRESS_INTERVAL
+                        now = time.monotonic()
+                        if now - last_redraw >= self.PROGRESS_INTERVAL:
+                            print(f"\r  📈 {progress.get_progress_string()}", end='', flush=True)
+                            last_redraw = now
+                        
+                        # Add inter-batch delay to reduce ES pressure (skip for sample mode)
+                        if not sample_mode and batch_num > 1:
+                            # Adaptive delay based on entity type complexity
+                            delay_map = {
+                                'organizations': 1.0,  # Simple docs
+                                'persons': 2.0,        # Medium complexity
+                                'serials': 1.0,        # Simple docs
+                                'projects': 3.0,       # Complex nested data
+                                'publications': 2.0    # Medium complexity
+                            }
+                            delay = delay_map.get(entity_type, 2.0)
+                            time.sleep(delay)
+                        
+                        if sample_mode and items_processed >= sample_size:
+                            break
+                        
+                    while pending:
+                        settle_oldest()
                 
-                print()  # New line after progress
+                print(f"\r  📈 {progress.get_progress_string()}")  # Final state, then new line
                 print(f"  ✅ Imported {progress.processed_items:,} {entity_type}")
+                self.entity_summary.append((entity_type, progress.processed_items, progress.elapsed_time))
                 # Clear progress tracking on success
                 if hasattr(self, '_last_processed_count'):
                     delattr(self, '_last_processed_count')
@@ -401,8 +457,12 @@ class StreamingImportPipeline:
             except (ConnectionTimeout, ConnectionError, TransportError) as e:
                 print(f"\n  🌐 ES timeout error: {e}")
                 
-                # Clean up any lingering scroll contexts
-                if hasattr(extractor, 'es_client') and hasattr(extractor.es_client, 'clear_all_scroll_contexts'):
+                # Clean up any lingering scroll contexts (only our own while
+                # another entity type may be prefetching)
+                if hasattr(extractor, 'stop_prefetch'):
+                    print("  🧹 Cleaning up scroll context...")
+                    extractor.stop_prefetch()
+                elif hasattr(extractor, 'es_client') and hasattr(extractor.es_client, 'clear_all_scroll_contexts'):
                     print("  🧹 Cleaning up scroll contexts...")
                     extractor.es_client.clear_all_scroll_contexts()
                 
@@ -435,6 +495,18 @@ class StreamingImportPipeline:
                     traceback.print_exc()
                     return False
                 
+    @staticmethod
+    def _to_columns(nodes: List[Dict[str, Any]]) -> Tuple[List[str], Dict[str, List[Any]]]:
+        """
+        Turn a list of node dicts into one list per property
+        
+        Nodes missing a property get None in its column, which SET n = {...}
+        leaves unset, exactly as if the key were absent from the node dict.
+        """
+        fields = list(dict.fromkeys(field for node in nodes for field in node))
+        columns = {field: [node.get(field) for node in nodes] for field in fields}
+        return fields, columns
+    
     def _import_nodes_batch_with_retry(self, node_label: str, nodes: List[Dict[str, Any]]) -> int:
         """Import a batch of nodes to Neo4j with retry logic"""
         if not nodes:
@@ -442,12 +514,17 @@ class StreamingImportPipeline:
         
         MAX_RETRIES = 3
         
+        # Ship the batch column-wise: each property name crosses the wire once
+        # per batch instead of once per node
+        fields, columns = self._to_columns(nodes)
+        properties = ", ".join(f"`{field}`: $columns.`{field}`[i]" for field in fields)
+        
         for attempt in range(MAX_RETRIES):
             try:
                 query = f"""
-                UNWIND $nodes AS node
-                MERGE (n:{node_label} {{es_id: node.es_id}})
-                SET n = node
+                UNWIND range(0, $count - 1) AS i
+                MERGE (n:{node_label} {{es_id: $columns.es_id[i]}})
+                SET n = {{{properties}}}
                 SET n.imported_at = datetime()
                 SET n.import_session = $session_id
                 RETURN count(n) as processed
@@ -456,7 +533,8 @@ class StreamingImportPipeline:
                 with self.connection.get_session() as session:
                     # Use explicit transaction with timeout
                     with session.begin_transaction() as tx:
-                        result = tx.run(query, nodes=nodes, session_id=self.import_session_id)
+                        result = tx.run(query, columns=columns, count=len(nodes),
+                                        session_id=self.import_session_id)
                         processed_count = result.single()["processed"]
                         tx.commit()
                         return processed_count
@@ -475,7 +553,9 @@ class StreamingImportPipeline:
                         print(f"\n    ❌ Skipping node due to memory constraints: {nodes[0].get('es_id', 'unknown')}")
                         return 0
                 elif attempt < MAX_RETRIES - 1:
-                    time.sleep(1)  # Brief pause before retry
+                    # Concurrent writers can deadlock on shared index entries;
+                    # back off further on each transient failure
+                    time.sleep(2 ** attempt if isinstance(e, TransientError) else 1)
                     continue
                 else:
                     raise
@@ -486,9 +566,9 @@ class StreamingImportPipeline:
         try:
             print("  🔍 Processing relationships by querying existing nodes...")
             
-            # Initialize ES client for lookups
-            from es_client.client import ElasticsearchClient
-            es_client = ElasticsearchClient()
+            # Reuse the process-wide ES client (and its connection pool) for lookups
+            from es_client.client import get_default_client
+            es_client = get_default_client()
             
             node_relationship_processor = NodeCentricRelationshipProcessor(
                 self.connection, es_client, self.import_session_id
@@ -544,7 +624,7 @@ class StreamingImportPipeline:
                             # Handle both PersonId and PersonID
                             person_id = person_data.get('PersonId') or person_data.get('PersonID')
                             if person_id:
-                                role = person_data.get('Role', {})
+                                role = person_data.get('Role', _EMPTY)
                                 batch_relationships.append({
                                     'source_id': str(person_id),
                                     'target_id': str(pub_id),
@@ -572,7 +652,7 @@ class StreamingImportPipeline:
                 if isinstance(series, list):
                     for series_item in series:
                         if isinstance(series_item, dict):
-                            serial_data = series_item.get('SerialItem', {})
+                            serial_data = series_item.get('SerialItem', _EMPTY)
                             if isinstance(serial_data, dict):
                                 serial_id = serial_data.get('Id')
                                 if serial_id:
@@ -766,11 +846,11 @@ class StreamingImportPipeline:
         
         return total_created
     
-    def _cache_node_id(self, entity_type: str, es_id: str):
-        """Cache node ID for relationship validation"""
-        if entity_type not in self.node_id_cache:
-            self.node_id_cache[entity_type] = set()
-        self.node_id_cache[entity_type].add(str(es_id))
+    def _cache_node_ids(self, entity_type: str, formatted_docs: List[Dict[str, Any]]):
+        """Cache the node IDs of a formatted batch for relationship validation"""
+        self.node_id_cache.setdefault(entity_type, set()).update(
+            str(doc['es_id']) for doc in formatted_docs
+        )
     
     def _validate_relationship(self, source_type: str, target_type: str, 
                              source_id: str, target_id: str) -> bool:
@@ -817,6 +897,11 @@ class StreamingImportPipeline:
         # Remove duplicates and sort
         return sorted(list(set(all_keywords)))
     
+    def _format_batch(self, doc_type: str, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Format a batch of documents, dropping the ones that fail to format"""
+        format_document = self._format_document
+        return [formatted for doc in docs if (formatted := format_document(doc_type, doc))]
+    
     def _format_document(self, doc_type: str, doc: Dict[str, Any]) -> Dict[str, Any]:
         """Format Elasticsearch document for Neo4j import"""
         try:
@@ -845,8 +930,10 @@ class StreamingImportPipeline:
         
         for identifier in identifiers:
             if isinstance(identifier, dict):
-                id_type = identifier.get('Type', {}).get('Value', '')
-                value =  identifier.get('Type', {}).get('Id', '')
+                # One Type lookup serves both fields
+                type_info = identifier.get('Type', _EMPTY)
+                id_type = type_info.get('Value', '')
+                value = type_info.get('Id', '')
                 if id_type == 'CPL_PERSONID':
                     cpl_id = value
                 elif id_type == 'SCOPUS_AUTHID':
@@ -870,6 +957,8 @@ class StreamingImportPipeline:
     
     def _format_organization_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
         """Format organization document"""
+        geo_lat = doc.get('GeoLat')
+        geo_long = doc.get('GeoLong')
         return {
             'es_id': doc.get('Id', ''),
             'name_swe': doc.get('NameSwe', ''),
@@ -878,8 +967,8 @@ class StreamingImportPipeline:
             'display_name_eng': doc.get('DisplayNameEng', ''),
             'city': doc.get('City', ''),
             'country': doc.get('Country', ''),
-            'geo_lat': float(doc.get('GeoLat', 0)) if doc.get('GeoLat') else 0,
-            'geo_long': float(doc.get('GeoLong', 0)) if doc.get('GeoLong') else 0,
+            'geo_lat': float(geo_lat) if geo_lat else 0,
+            'geo_long': float(geo_long) if geo_long else 0,
             'level': doc.get('Level', 0),
             # 'is_active': doc.get('IsActive', False),
             # 'organization_types_json': json.dumps(doc.get('OrganizationTypes', [])),
@@ -901,14 +990,14 @@ class StreamingImportPipeline:
         pub_type = doc.get('PublicationType', '')
         if isinstance(pub_type, dict):
             formatted['publication_type'] = pub_type.get('Value', '')
-            formatted['publication_type_json'] = json.dumps(pub_type)
+            formatted['publication_type_json'] = _dumps(pub_type)
         else:
             formatted['publication_type'] = str(pub_type)
         
         source = doc.get('Source', '')
         if isinstance(source, dict):
             formatted['source'] = source.get('Title', source.get('Value', ''))
-            formatted['source_json'] = json.dumps(source)
+            formatted['source_json'] = _dumps(source)
         else:
             formatted['source'] = str(source)
         
@@ -1103,7 +1192,7 @@ class NodeCentricRelationshipProcessor:
                             if isinstance(person_data, dict):
                                 person_id = person_data.get('PersonId') or person_data.get('PersonID')
                                 if person_id:
-                                    role = person_data.get('Role', {})
+                                    role = person_data.get('Role', _EMPTY)
                                     batch_relationships.append({
                                         'source_id': str(person_id),
                                         'target_id': str(pub_id),
@@ -1316,7 +1405,7 @@ class NodeCentricRelationshipProcessor:
                     if isinstance(series, list):
                         for series_item in series:
                             if isinstance(series_item, dict):
-                                serial_data = series_item.get('SerialItem', {})
+                                serial_data = series_item.get('SerialItem', _EMPTY)
                                 if isinstance(serial_data, dict):
                                     serial_id = serial_data.get('Id')
                                     if serial_id:
@@ -0,0 +1,23 @@
+"""
+JSON encoding and decoding shared by the clients, importers and CLIs (orjson)
+"""
+
+from typing import Any, Callable, Optional
+
+import orjson
+
+# Accepts str as well as bytes
+loads = orjson.loads
+
+
+def dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialize a value to a compact JSON string"""
+    return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def dumps_bytes(value: Any, indent: bool = False) -> bytes:
+    """Serialize a value to UTF-8 JSON bytes, 2-space indented if indent is set"""
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(value, option=option)
@@ -4,10 +4,10 @@ Unit tests for Elasticsearch client
 
 import pytest
 import os
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, ANY
 from elasticsearch import Elasticsearch
 
-from es_client.client import ElasticsearchClient
+from es_client.client import ElasticsearchClient, OrjsonSerializer
 
 
 class TestElasticsearchClient:
@@ -30,9 +30,26 @@ class TestElasticsearchClient:
             mock_es.assert_called_once_with(
                 hosts=['test-host.com'],
                 http_auth=('test_user', 'test_pass'),
-                verify_certs=False
+                verify_certs=False,
+                maxsize=32,
+                http_compress=True,
+                timeout=60,
+                max_retries=3,
+                retry_on_timeout=True,
+                serializer=ANY
             )
     
+    def test_orjson_serializer_round_trip(self):
+        """Test OrjsonSerializer matches the stdlib serializer's contract"""
+        serializer = OrjsonSerializer()
+        
+        assert serializer.loads('{"hits": {"hits": [{"_source": {"Id": "1"}}]}}') == {
+            'hits': {'hits': [{'_source': {'Id': '1'}}]}
+        }
+        assert serializer.loads(serializer.dumps({'query': {'match_all': {}}})) == {'query': {'match_all': {}}}
+        # Already-serialized bodies are passed through untouched
+        assert serializer.dumps('{"index": "a"}') == '{"index": "a"}'
+    
     @patch.dict(os.environ, {}, clear=True)
     def test_client_initialization_missing_env_vars(self):
         """Test client initialization fails with missing environment variables"""
@@ -140,6 +157,44 @@ class TestElasticsearchClient:
                 index='test-index',
                 body={'query': {'match_all': {}}}
             )
+            
+            # A repeat within the TTL is served from the cache
+            assert client.count_batches('test-index', batch_size=300) == 4
+            assert mock_client.count.call_count == 1
+            
+            # A different query is a different cache entry
+            client.count_documents('test-index', {'term': {'IsActive': True}})
+            assert mock_client.count.call_count == 2
+    
+    @patch.dict(os.environ, {
+        'ES_HOST': 'test-host.com',
+        'ES_USER': 'test_user',
+        'ES_PASS': 'test_pass'
+    })
+    def test_count_documents_multi(self):
+        """Test count_documents_multi counts every index in one msearch"""
+        with patch('es_client.client.Elasticsearch') as mock_es:
+            mock_client = MagicMock()
+            mock_client.msearch.return_value = {
+                'responses': [
+                    {'hits': {'total': 10, 'hits': []}},
+                    {'hits': {'total': {'value': 20, 'relation': 'eq'}, 'hits': []}}
+                ]
+            }
+            mock_es.return_value = mock_client
+            
+            client = ElasticsearchClient()
+            result = client.count_documents_multi(['index-a', 'index-b'])
+            
+            assert result == {'index-a': 10, 'index-b': 20}
+            mock_client.msearch.assert_called_once()
+            body = mock_client.msearch.call_args.kwargs['body']
+            assert [header['index'] for header in body[::2]] == ['index-a', 'index-b']
+            assert all(query['size'] == 0 for query in body[1::2])
+            
+            # The totals seed the count cache, so no separate count is sent
+            assert client.count_documents('index-b') == 20
+            mock_client.count.assert_not_called()
     
     @patch.dict(os.environ, {
         'ES_HOST': 'test-host.com',
@@ -170,10 +225,69 @@ class TestElasticsearchClient:
                 index='test-index',
                 body={
                     'query': {'match_all': {}},
-                    'size': 2
+                    'size': 2,
+                    'track_total_hits': False
                 }
             )
     
+    @patch.dict(os.environ, {
+        'ES_HOST': 'test-host.com',
+        'ES_USER': 'test_user',
+        'ES_PASS': 'test_pass'
+    })
+    def test_msearch(self):
+        """Test msearch sends all searches in a single request"""
+        expected_response = {
+            'responses': [
+                {'hits': {'hits': [{'_id': 'a', '_source': {'Id': 'a'}}]}},
+                {'hits': {'hits': [{'_id': 'b', '_source': {'Id': 'b'}}]}}
+            ]
+        }
+        body = [
+            {'index': 'index-a'}, {'query': {'match_all': {}}, 'size': 1},
+            {'index': 'index-b'}, {'query': {'match_all': {}}, 'size': 1}
+        ]
+        
+        with patch('es_client.client.Elasticsearch') as mock_es:
+            mock_client = MagicMock()
+            mock_client.msearch.return_value = expected_response
+            mock_es.return_value = mock_client
+            
+            client = ElasticsearchClient()
+            result = client.msearch(body)
+            
+            assert result == expected_response
+            mock_client.msearch.assert_called_once_with(body=body)
+    
+    @patch.dict(os.environ, {
+        'ES_HOST': 'test-host.com',
+        'ES_USER': 'test_user',
+        'ES_PASS': 'test_pass'
+    })
+    def test_mget(self):
+        """Test mget fetches documents across indices in one request"""
+        docs = [
+            {'_index': 'index-a', '_id': '1'},
+            {'_index': 'index-b', '_id': '2'}
+        ]
+        expected_response = {
+            'docs': [
+                {'_id': '1', 'found': True, '_source': {'Id': '1'}},
+                {'_id': '2', 'found': False}
+            ]
+        }
+        
+        with patch('es_client.client.Elasticsearch') as mock_es:
+            mock_client = MagicMock()
+            mock_client.mget.return_value = expected_response
+            mock_es.return_value = mock_client
+            
+            client = ElasticsearchClient()
+            result = client.mget(docs)
+            
+            assert result == expected_response
+            mock_client.mget.assert_called_once_with(body={'docs': docs})
+    
     @patch.dict(os.environ, {
         'ES_HOST': 'test-host.com',
         'ES_USER': 'test_user',
@@ -207,6 +321,132 @@ class TestElasticsearchClient:
                 scroll='5m'
             )
     
+    @patch.dict(os.environ, {
+        'ES_HOST': 'test-host.com',
+        'ES_USER': 'test_user',
+        'ES_PASS': 'test_pass'
+    })
+    def test_scan_documents(self):
+        """Test scan_documents scrolls in _doc order and follows the latest scroll id"""
+        with patch('es_client.client.Elasticsearch') as mock_es:
+            mock_client = MagicMock()
+            mock_client.search.return_value = {
+                '_scroll_id': 'scroll-1', 'hits': {'hits': [{'_source': {'Id': '1'}}]}
+            }
+            mock_client.scroll.side_effect = [
+                {'_scroll_id': 'scroll-2', 'hits': {'hits': [{'_source': {'Id': '2'}}]}},
+                {'_scroll_id': 'scroll-3'}  # filter_path drops 'hits' from an empty page
+            ]
+            mock_es.return_value = mock_client
+            
+            client = ElasticsearchClient()
+            batches = list(client.scan_documents('test-index', batch_size=1))
+            
+            assert batches == [[{'Id': '1'}], [{'Id': '2'}]]
+            assert mock_client.search.call_args.kwargs['body'] == {
+                'query': {'match_all': {}}, 'sort': ['_doc']
+            }
+            assert [call.kwargs['scroll_id'] for call in mock_client.scroll.call_args_list] == ['scroll-1', 'scroll-2']
+            assert mock_client.scroll.call_args.kwargs['filter_path'] == mock_client.search.call_args.kwargs['filter_path']
+            mock_client.clear_scroll.assert_called_once_with(scroll_id='scroll-3')
+            
+            # Stopping early still clears the context of the prefetched page
+            mock_client.scroll.side_effect = [
+                {'_scroll_id': 'scroll-2', 'hits': {'hits': [{'_source': {'Id': '2'}}]}}
+            ]
+            mock_client.clear_scroll.reset_mock()
+            batches = client.scan_documents('test-index', batch_size=1)
+            assert next(batches) == [{'Id': '1'}]
+            batches.close()
+            mock_client.clear_scroll.assert_called_once_with(scroll_id='scroll-2')
+            
+            # A page missing shards fails instead of silently dropping their hits
+            mock_client.search.return_value = {
+                '_scroll_id': 'scroll-1', '_shards': {'total': 5, 'successful': 4},
+                'hits': {'hits': [{'_source': {'Id': '1'}}]}
+            }
+            with pytest.raises(RuntimeError, match="4 of 5 shards"):
+                list(client.scan_documents('test-index', batch_size=1))
+    
+    @patch.dict(os.environ, {
+        'ES_HOST': 'test-host.com',
+        'ES_USER': 'test_user',
+        'ES_PASS': 'test_pass'
+    })
+    def test_scan_documents_iter(self):
+        """Test scan_documents_iter yields single documents across scroll pages"""
+        with patch('es_client.client.Elasticsearch') as mock_es:
+            mock_client = MagicMock()
+            mock_client.search.return_value = {
+                '_scroll_id': 'scroll-1',
+                'hits': {'hits': [{'_source': {'Id': '1'}}, {'_source': {'Id': '2'}}]}
+            }
+            mock_client.scroll.side_effect = [
+                {'_scroll_id': 'scroll-2', 'hits': {'hits': [{'_source': {'Id': '3'}}]}},
+                {'_scroll_id': 'scroll-3'}
+            ]
+            mock_es.return_value = mock_client
+            
+            client = ElasticsearchClient()
+            docs = list(client.scan_documents_iter('test-index', batch_size=2))
+            
+            assert docs == [{'Id': '1'}, {'Id': '2'}, {'Id': '3'}]
+            mock_client.clear_scroll.assert_called_once_with(scroll_id='scroll-3')
+    
+    @patch.dict(os.environ, {
+        'ES_HOST': 'test-host.com',
+        'ES_USER': 'test_user',
+        'ES_PASS': 'test_pass'
+    })
+    def test_scan_documents_sliced(self):
+        """Test scan_documents_sliced scrolls every slice and clears each context"""
+        def search(index, body, **kwargs):
+            slice_id = body['slice']['id']
+            return {
+                '_scroll_id': f'scroll-{slice_id}',
+                'hits': {'hits': [{'_source': {'Id': f'{slice_id}-1'}}]}
+            }
+        
+        with patch('es_client.client.Elasticsearch') as mock_es:
+            mock_client = MagicMock()
+            mock_client.search.side_effect = search
+            mock_client.scroll.side_effect = lambda scroll_id, **kwargs: {'_scroll_id': scroll_id}
+            mock_es.return_value = mock_client
+            
+            client = ElasticsearchClient()
+            batches = list(client.scan_documents_sliced('test-index', slices=3, batch_size=1))
+            
+            assert sorted(doc['Id'] for batch in batches for doc in batch) == ['0-1', '1-1', '2-1']
+            slices = sorted(call.kwargs['body']['slice']['id'] for call in mock_client.search.call_args_list)
+            assert slices == [0, 1, 2]
+            cleared = sorted(call.kwargs['scroll_id'] for call in mock_client.clear_scroll.call_args_list)
+            assert cleared == ['scroll-0', 'scroll-1', 'scroll-2']
+    
+    @patch.dict(os.environ, {
+        'ES_HOST': 'test-host.com',
+        'ES_USER': 'test_user',
+        'ES_PASS': 'test_pass'
+    })
+    def test_scan_documents_partitioned(self):
+        """Test scan_documents_partitioned runs one scroll per query with bounded workers"""
+        def search(index, body, **kwargs):
+            year = body['query']['term']['Year']
+            assert 'slice' not in body
+            return {'_scroll_id': f'scroll-{year}', 'hits': {'hits': [{'_source': {'Year': year}}]}}
+        
+        with patch('es_client.client.Elasticsearch') as mock_es:
+            mock_client = MagicMock()
+            mock_client.search.side_effect = search
+            mock_client.scroll.side_effect = lambda scroll_id, **kwargs: {'_scroll_id': scroll_id}
+            mock_es.return_value = mock_client
+            
+            client = ElasticsearchClient()
+            queries = [{'term': {'Year': year}} for year in (2020, 2021, 2022)]
+            batches = list(client.scan_documents_partitioned('test-index', queries, max_workers=2))
+            
+            assert sorted(doc['Year'] for batch in batches for doc in batch) == [2020, 2021, 2022]
+            assert mock_client.clear_scroll.call_count == 3
+    
     @patch.dict(os.environ, {
         'ES_HOST': 'test-host.com',
         'ES_USER': 'test_user',
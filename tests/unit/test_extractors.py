@@ -14,6 +14,7 @@ from es_client.extractors import (
     ProjectExtractor,
     SerialExtractor
 )
+from es_client.base_extractor import PrefetchingExtractor
 
 
 class TestBaseExtractor:
@@ -52,7 +53,7 @@ class TestBaseExtractor:
     
     def test_extract_by_ids(self, mock_es_client, mock_es_search_response):
         """Test extract_by_ids method"""
-        mock_es_client.search.return_value = mock_es_search_response
+        mock_es_client.msearch.return_value = {'responses': [mock_es_search_response]}
         
         extractor = BaseExtractor(mock_es_client, 'test-index')
         result = extractor.extract_by_ids(['1', '2'])
@@ -63,15 +64,27 @@ class TestBaseExtractor:
         ]
         assert result == expected
         
-        # Verify the search query
-        expected_body = {
-            "query": {
-                "terms": {
-                    "_id": ['1', '2']
-                }
-            }
-        }
-        mock_es_client.search.assert_called_once_with('test-index', expected_body)
+        # Verify the msearch body
+        expected_body = [
+            {"index": "test-index"},
+            {"query": {"terms": {"_id": ['1', '2']}}, "size": 2, "track_total_hits": False}
+        ]
+        mock_es_client.msearch.assert_called_once_with(expected_body)
+    
+    def test_extract_by_ids_chunks(self, mock_es_client):
+        """Test extract_by_ids splits large ID lists into one search per chunk"""
+        mock_es_client.msearch.return_value = {'responses': [
+            {'hits': {'hits': [{'_source': {'Id': '1'}}]}},
+            {'hits': {'hits': [{'_source': {'Id': '3'}}]}}
+        ]}
+        
+        extractor = BaseExtractor(mock_es_client, 'test-index')
+        extractor.ID_CHUNK_SIZE = 2
+        result = extractor.extract_by_ids(['1', '2', '3'])
+        
+        assert result == [{'Id': '1'}, {'Id': '3'}]
+        body = mock_es_client.msearch.call_args.args[0]
+        assert [query['query']['terms']['_id'] for query in body[1::2]] == [['1', '2'], ['3']]
     
     def test_extract_all_single_batch(self, mock_es_client):
         """Test extract_all method with single batch"""
@@ -103,6 +116,36 @@ class TestBaseExtractor:
             {'Id': '2', 'Title': 'Doc 2'}
         ]
         assert results == expected
+    
+    def test_extract_all_batches(self, mock_es_client):
+        """Test extract_all_batches yields one list per scroll response"""
+        mock_es_client.scroll.return_value = {
+            'hits': {'hits': [{'_source': {'Id': '1'}}, {'_source': {'Id': '2'}}]},
+            '_scroll_id': 'test_scroll_id'
+        }
+        mock_es_client.scroll_continue.side_effect = [
+            {'hits': {'hits': [{'_source': {'Id': '3'}}]}, '_scroll_id': 'test_scroll_id'},
+            {'hits': {'hits': []}, '_scroll_id': 'test_scroll_id'}
+        ]
+        
+        extractor = BaseExtractor(mock_es_client, 'test-index')
+        batches = list(extractor.extract_all_batches(batch_size=2))
+        
+        assert batches == [[{'Id': '1'}, {'Id': '2'}], [{'Id': '3'}]]
+    
+    def test_extract_all_sliced(self, mock_es_client):
+        """Test extract_all hands sliced reads to the client's sliced scroll"""
+        mock_es_client.scan_documents_sliced.return_value = iter([
+            [{'Id': '0-1'}], [{'Id': '1-1'}], [{'Id': '2-1'}]
+        ])
+        
+        extractor = BaseExtractor(mock_es_client, 'test-index')
+        results = list(extractor.extract_all(batch_size=1000, slices=3))
+        
+        assert sorted(doc['Id'] for doc in results) == ['0-1', '1-1', '2-1']
+        mock_es_client.scan_documents_sliced.assert_called_once_with(
+            'test-index', {"match_all": {}}, slices=3, batch_size=1000
+        )
 
 
 class TestPersonExtractor:
@@ -117,22 +160,9 @@ class TestPersonExtractor:
     
     def test_extract_active_persons(self, mock_es_client):
         """Test extract_active_persons method"""
-        mock_response = {
-            'hits': {
-                'hits': [
-                    {'_source': {'Id': '1', 'IsActive': True, 'IsDeleted': False}}
-                ]
-            },
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_empty_response = {
-            'hits': {'hits': []},
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_es_client.scroll.return_value = mock_response
-        mock_es_client.scroll_continue.return_value = mock_empty_response
+        mock_es_client.scan_documents.return_value = iter([
+            [{'Id': '1', 'IsActive': True, 'IsDeleted': False}]
+        ])
         
         extractor = PersonExtractor(mock_es_client)
         results = list(extractor.extract_active_persons())
@@ -141,42 +171,26 @@ class TestPersonExtractor:
         assert results[0]['Id'] == '1'
         assert results[0]['IsActive'] is True
         
-        # Verify the query structure
-        expected_body = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {"term": {"IsActive": True}},
-                        {"term": {"IsDeleted": False}}
-                    ]
-                }
+        # Verify the query structure: non-scoring filter context
+        expected_query = {
+            "bool": {
+                "filter": [
+                    {"term": {"IsActive": True}},
+                    {"term": {"IsDeleted": False}}
+                ]
             }
         }
-        mock_es_client.scroll.assert_called_once_with(
-            'research-persons-static', 
-            expected_body, 
-            scroll='5m', 
-            size=1000
+        mock_es_client.scan_documents.assert_called_once_with(
+            index='research-persons-static',
+            query=expected_query,
+            batch_size=1000
         )
     
     def test_extract_persons_with_affiliations(self, mock_es_client):
         """Test extract_persons_with_affiliations method"""
-        mock_response = {
-            'hits': {
-                'hits': [
-                    {'_source': {'Id': '1', 'HasOrganizationHome': True, 'OrganizationHomeCount': 2}}
-                ]
-            },
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_empty_response = {
-            'hits': {'hits': []},
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_es_client.scroll.return_value = mock_response
-        mock_es_client.scroll_continue.return_value = mock_empty_response
+        mock_es_client.scan_documents.return_value = iter([
+            [{'Id': '1', 'HasOrganizationHome': True, 'OrganizationHomeCount': 2}]
+        ])
         
         extractor = PersonExtractor(mock_es_client)
         results = list(extractor.extract_persons_with_affiliations())
@@ -184,6 +198,7 @@ class TestPersonExtractor:
         assert len(results) == 1
         assert results[0]['HasOrganizationHome'] is True
         assert results[0]['OrganizationHomeCount'] == 2
+        assert 'filter' in mock_es_client.scan_documents.call_args.kwargs['query']['bool']
 
 
 class TestOrganizationExtractor:
@@ -198,22 +213,9 @@ class TestOrganizationExtractor:
     
     def test_extract_active_organizations(self, mock_es_client):
         """Test extract_active_organizations method"""
-        mock_response = {
-            'hits': {
-                'hits': [
-                    {'_source': {'Id': '1', 'IsActive': True}}
-                ]
-            },
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_empty_response = {
-            'hits': {'hits': []},
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_es_client.scroll.return_value = mock_response
-        mock_es_client.scroll_continue.return_value = mock_empty_response
+        mock_es_client.scan_documents.return_value = iter([
+            [{'Id': '1', 'IsActive': True}]
+        ])
         
         extractor = OrganizationExtractor(mock_es_client)
         results = list(extractor.extract_active_organizations())
@@ -222,16 +224,10 @@ class TestOrganizationExtractor:
         assert results[0]['IsActive'] is True
         
         # Verify the query structure
-        expected_body = {
-            "query": {
-                "term": {"IsActive": True}
-            }
-        }
-        mock_es_client.scroll.assert_called_once_with(
-            'research-organizations-static', 
-            expected_body, 
-            scroll='5m', 
-            size=1000
+        mock_es_client.scan_documents.assert_called_once_with(
+            index='research-organizations-static',
+            query={"bool": {"filter": [{"term": {"IsActive": True}}]}},
+            batch_size=1000
         )
 
 
@@ -247,22 +243,9 @@ class TestPublicationExtractor:
     
     def test_extract_published_publications(self, mock_es_client):
         """Test extract_published_publications method"""
-        mock_response = {
-            'hits': {
-                'hits': [
-                    {'_source': {'Id': '1', 'IsDraft': False, 'IsDeleted': False}}
-                ]
-            },
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_empty_response = {
-            'hits': {'hits': []},
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_es_client.scroll.return_value = mock_response
-        mock_es_client.scroll_continue.return_value = mock_empty_response
+        mock_es_client.scan_documents_sliced.return_value = iter([
+            [{'Id': '1', 'IsDraft': False, 'IsDeleted': False}]
+        ])
         
         extractor = PublicationExtractor(mock_es_client)
         results = list(extractor.extract_published_publications())
@@ -270,25 +253,13 @@ class TestPublicationExtractor:
         assert len(results) == 1
         assert results[0]['IsDraft'] is False
         assert results[0]['IsDeleted'] is False
+        assert mock_es_client.scan_documents_sliced.call_args.kwargs['slices'] == 1
     
     def test_extract_by_year_range(self, mock_es_client):
         """Test extract_by_year_range method"""
-        mock_response = {
-            'hits': {
-                'hits': [
-                    {'_source': {'Id': '1', 'Year': 2020, 'IsDraft': False, 'IsDeleted': False}}
-                ]
-            },
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_empty_response = {
-            'hits': {'hits': []},
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_es_client.scroll.return_value = mock_response
-        mock_es_client.scroll_continue.return_value = mock_empty_response
+        mock_es_client.scan_documents_partitioned.return_value = iter([
+            [{'Id': '1', 'Year': 2020, 'IsDraft': False, 'IsDeleted': False}]
+        ])
         
         extractor = PublicationExtractor(mock_es_client)
         results = list(extractor.extract_by_year_range(2020, 2022))
@@ -296,24 +267,20 @@ class TestPublicationExtractor:
         assert len(results) == 1
         assert results[0]['Year'] == 2020
         
-        # Verify the query structure includes year range
-        expected_body = {
-            "query": {
+        # Verify one published-only query per year
+        queries = mock_es_client.scan_documents_partitioned.call_args.kwargs['queries']
+        assert queries == [
+            {
                 "bool": {
-                    "must": [
-                        {"range": {"Year": {"gte": 2020, "lte": 2022}}},
+                    "filter": [
+                        {"term": {"Year": year}},
                         {"term": {"IsDraft": False}},
                         {"term": {"IsDeleted": False}}
                     ]
                 }
             }
-        }
-        mock_es_client.scroll.assert_called_once_with(
-            'research-publications-static', 
-            expected_body, 
-            scroll='5m', 
-            size=1000
-        )
+            for year in (2020, 2021, 2022)
+        ]
 
 
 class TestProjectExtractor:
@@ -328,22 +295,9 @@ class TestProjectExtractor:
     
     def test_extract_active_projects(self, mock_es_client):
         """Test extract_active_projects method"""
-        mock_response = {
-            'hits': {
-                'hits': [
-                    {'_source': {'ID': 1, 'PublishStatus': 3}}
-                ]
-            },
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_empty_response = {
-            'hits': {'hits': []},
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_es_client.scroll.return_value = mock_response
-        mock_es_client.scroll_continue.return_value = mock_empty_response
+        mock_es_client.scan_documents.return_value = iter([
+            [{'ID': 1, 'PublishStatus': 3}]
+        ])
         
         extractor = ProjectExtractor(mock_es_client)
         results = list(extractor.extract_active_projects())
@@ -364,25 +318,69 @@ class TestSerialExtractor:
     
     def test_extract_active_serials(self, mock_es_client):
         """Test extract_active_serials method"""
-        mock_response = {
-            'hits': {
-                'hits': [
-                    {'_source': {'Id': '1', 'IsDeleted': False}}
-                ]
-            },
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_empty_response = {
-            'hits': {'hits': []},
-            '_scroll_id': 'test_scroll_id'
-        }
-        
-        mock_es_client.scroll.return_value = mock_response
-        mock_es_client.scroll_continue.return_value = mock_empty_response
+        mock_es_client.scan_documents.return_value = iter([
+            [{'Id': '1', 'IsDeleted': False}]
+        ])
         
         extractor = SerialExtractor(mock_es_client)
         results = list(extractor.extract_active_serials())
         
         assert len(results) == 1
-        assert results[0]['IsDeleted'] is False
\ No newline at end of file
+        assert results[0]['IsDeleted'] is False
+
+
+class TestPrefetchingExtractor:
+    """Test cases for PrefetchingExtractor"""
+    
+    def test_yields_all_batches_and_delegates(self, mock_es_client):
+        """Test prefetched batches arrive in order and attributes pass through"""
+        batches = [[{'Id': '1'}], [{'Id': '2'}], [{'Id': '3'}]]
+        mock_es_client.scan_documents.return_value = iter(batches)
+        
+        extractor = PrefetchingExtractor(PersonExtractor(mock_es_client, batch_size=1))
+        
+        assert list(extractor.extract_batches()) == batches
+        assert extractor.batch_size == 1
+        assert extractor.index_name == 'research-persons-static'
+    
+    def test_propagates_scroll_errors(self, mock_es_client):
+        """Test an error in the background scroll is raised to the consumer"""
+        mock_es_client.scan_documents.side_effect = RuntimeError("scroll expired")
+        
+        extractor = PrefetchingExtractor(PersonExtractor(mock_es_client, batch_size=1))
+        
+        with pytest.raises(RuntimeError, match="scroll expired"):
+            list(extractor.extract_batches())
+    
+    def test_does_not_scroll_until_started(self, mock_es_client):
+        """Test the background scroll only opens on start_prefetch()"""
+        mock_es_client.scan_documents.return_value = iter([[{'Id': '1'}]])
+        
+        extractor = PrefetchingExtractor(PersonExtractor(mock_es_client, batch_size=1))
+        mock_es_client.scan_documents.assert_not_called()
+        
+        extractor.start_prefetch()
+        extractor.stop_prefetch()
+        mock_es_client.scan_documents.assert_called_once()
+    
+    def test_next_prefetch_waits_for_exhausted_stream(self, mock_es_client):
+        """Test a chained prefetch stays closed while the current stream is still being read"""
+        batches = {
+            'research-persons-static': [[{'Id': 'p1'}], [{'Id': 'p2'}]],
+            'research-organizations-static': [[{'Id': 'o1'}]]
+        }
+        mock_es_client.scan_documents.side_effect = lambda index, **kwargs: iter(batches[index])
+        
+        persons = PrefetchingExtractor(PersonExtractor(mock_es_client, batch_size=1))
+        organizations = PrefetchingExtractor(OrganizationExtractor(mock_es_client, batch_size=1))
+        persons.prefetch_next(organizations)
+        
+        stream = persons.extract_batches()
+        assert next(stream) == [{'Id': 'p1'}]
+        # The consumer is busy with persons; no organizations scroll may sit idle
+        assert organizations._thread is None
+        
+        assert list(stream) == [[{'Id': 'p2'}]]
+        organizations.stop_prefetch()
+        scrolled = [call.kwargs['index'] for call in mock_es_client.scan_documents.call_args_list]
+        assert scrolled == ['research-persons-static', 'research-organizations-static']